@@ -0,0 +1,21 @@
+"Compare a CPU-bound handler run in the default thread pool against `executor='process'`"
+import asyncio, time, httpx2
+from fasthtml.common import *
+
+app = FastHTML(executors={'process': ProcessPool()})
+
+def fib(n): return n if n<2 else fib(n-1)+fib(n-2)
+def fib_page(n:int): return Div(*[P(fib(n), id=f'r{i}') for i in range(10)])
+
+app.route('/thread')(fib_page)
+app.route('/process', executor='process')(fib_page)
+
+async def bench(path, n=22, reqs=16):
+    async with httpx2.AsyncClient(transport=httpx2.ASGITransport(app=app), base_url='http://test') as cli:
+        start = time.perf_counter()
+        await asyncio.gather(*[cli.get(path, params=dict(n=n), headers={'HX-Request': '1'}) for _ in range(reqs)])
+        return time.perf_counter()-start
+
+if __name__ == '__main__':
+    app.executors['process'].warm()
+    for path in ('/thread', '/process'): print(f'{path:>9}: {asyncio.run(bench(path)):.2f}s')
@@ -5,7 +5,8 @@ d = { 'settings': { 'branch': 'main',
                 'doc_host': 'https://www.fastht.ml',
                 'git_url': 'https://github.com/AnswerDotAI/fasthtml',
                 'lib_path': 'fasthtml'},
-  'syms': { 'fasthtml.authmw': {},
+  'syms': { 'fasthtml.admission': {},
+            'fasthtml.authmw': {},
             'fasthtml.basics': {},
             'fasthtml.cli': { 'fasthtml.cli._run': ('api/cli.html#_run', 'fasthtml/cli.py'),
                               'fasthtml.cli.railway_deploy': ('api/cli.html#railway_deploy', 'fasthtml/cli.py'),
@@ -40,9 +41,33 @@ d = { 'settings': { 'branch': 'main',
                                'fasthtml.core.Beforeware': ('api/core.html#beforeware', 'fasthtml/core.py'),
                                'fasthtml.core.Beforeware.__init__': ('api/core.html#beforeware.__init__', 'fasthtml/core.py'),
                                'fasthtml.core.Beforeware.__repr__': ('api/core.html#beforeware.__repr__', 'fasthtml/core.py'),
+                               'fasthtml.core.Bulkhead': ('api/core.html#bulkhead', 'fasthtml/core.py'),
+                               'fasthtml.core.Bulkhead.__init__': ('api/core.html#bulkhead.__init__', 'fasthtml/core.py'),
+                               'fasthtml.core.Bulkhead._call': ('api/core.html#bulkhead._call', 'fasthtml/core.py'),
+                               'fasthtml.core.Bulkhead.run': ('api/core.html#bulkhead.run', 'fasthtml/core.py'),
+                               'fasthtml.core.Bulkhead.stats': ('api/core.html#bulkhead.stats', 'fasthtml/core.py'),
+                               'fasthtml.core.CancelToken': ('api/core.html#canceltoken', 'fasthtml/core.py'),
+                               'fasthtml.core.CancelToken.__init__': ('api/core.html#canceltoken.__init__', 'fasthtml/core.py'),
+                               'fasthtml.core.CancelToken.cancel': ('api/core.html#canceltoken.cancel', 'fasthtml/core.py'),
+                               'fasthtml.core.CancelToken.cancelled': ('api/core.html#canceltoken.cancelled', 'fasthtml/core.py'),
+                               'fasthtml.core.CancelToken.check': ('api/core.html#canceltoken.check', 'fasthtml/core.py'),
+                               'fasthtml.core.CancelToken.remaining': ('api/core.html#canceltoken.remaining', 'fasthtml/core.py'),
+                               'fasthtml.core.CancelToken.wait': ('api/core.html#canceltoken.wait', 'fasthtml/core.py'),
+                               'fasthtml.core.CancelToken.watch': ('api/core.html#canceltoken.watch', 'fasthtml/core.py'),
                                'fasthtml.core.Client': ('api/core.html#client', 'fasthtml/core.py'),
                                'fasthtml.core.Client.__init__': ('api/core.html#client.__init__', 'fasthtml/core.py'),
                                'fasthtml.core.Client._sync': ('api/core.html#client._sync', 'fasthtml/core.py'),
+                               'fasthtml.core.Deferred': ('api/core.html#deferred', 'fasthtml/core.py'),
+                               'fasthtml.core.Deferred.__ft__': ('api/core.html#deferred.__ft__', 'fasthtml/core.py'),
+                               'fasthtml.core.Deferred.__init__': ('api/core.html#deferred.__init__', 'fasthtml/core.py'),
+                               'fasthtml.core.Deferred.resolve': ('api/core.html#deferred.resolve', 'fasthtml/core.py'),
+                               'fasthtml.core.Deferred.swap': ('api/core.html#deferred.swap', 'fasthtml/core.py'),
+                               'fasthtml.core.EventChannel': ('api/core.html#eventchannel', 'fasthtml/core.py'),
+                               'fasthtml.core.EventChannel.__init__': ('api/core.html#eventchannel.__init__', 'fasthtml/core.py'),
+                               'fasthtml.core.EventChannel._missed': ('api/core.html#eventchannel._missed', 'fasthtml/core.py'),
+                               'fasthtml.core.EventChannel.publish': ('api/core.html#eventchannel.publish', 'fasthtml/core.py'),
+                               'fasthtml.core.EventChannel.stream': ('api/core.html#eventchannel.stream', 'fasthtml/core.py'),
+                               'fasthtml.core.EventChannel.subscribe': ('api/core.html#eventchannel.subscribe', 'fasthtml/core.py'),
                                'fasthtml.core.EventStream': ('api/core.html#eventstream', 'fasthtml/core.py'),
                                'fasthtml.core.FastHTML': ('api/core.html#fasthtml', 'fasthtml/core.py'),
                                'fasthtml.core.FastHTML.__init__': ('api/core.html#fasthtml.__init__', 'fasthtml/core.py'),
@@ -50,6 +75,7 @@ d = { 'settings': { 'branch': 'main',
                                'fasthtml.core.FastHTML._add_routes': ('api/core.html#fasthtml._add_routes', 'fasthtml/core.py'),
                                'fasthtml.core.FastHTML._add_ws': ('api/core.html#fasthtml._add_ws', 'fasthtml/core.py'),
                                'fasthtml.core.FastHTML._endp': ('api/core.html#fasthtml._endp', 'fasthtml/core.py'),
+                               'fasthtml.core.FastHTML._lazy_url': ('api/core.html#fasthtml._lazy_url', 'fasthtml/core.py'),
                                'fasthtml.core.FastHTML.add_route': ('api/core.html#fasthtml.add_route', 'fasthtml/core.py'),
                                'fasthtml.core.FastHTML.add_websocket_route': ( 'api/core.html#fasthtml.add_websocket_route',
                                                                                'fasthtml/core.py'),
@@ -57,7 +83,9 @@ d = { 'settings': { 'branch': 'main',
                                'fasthtml.core.FastHTML.devtools_json': ('api/core.html#fasthtml.devtools_json', 'fasthtml/core.py'),
                                'fasthtml.core.FastHTML.get_client': ('api/core.html#fasthtml.get_client', 'fasthtml/core.py'),
                                'fasthtml.core.FastHTML.get_testclient': ('api/core.html#fasthtml.get_testclient', 'fasthtml/core.py'),
+                               'fasthtml.core.FastHTML.lazy': ('api/core.html#fasthtml.lazy', 'fasthtml/core.py'),
                                'fasthtml.core.FastHTML.on_event': ('api/core.html#fasthtml.on_event', 'fasthtml/core.py'),
+                               'fasthtml.core.FastHTML.provide': ('api/core.html#fasthtml.provide', 'fasthtml/core.py'),
                                'fasthtml.core.FastHTML.route': ('api/core.html#fasthtml.route', 'fasthtml/core.py'),
                                'fasthtml.core.FastHTML.set_lifespan': ('api/core.html#fasthtml.set_lifespan', 'fasthtml/core.py'),
                                'fasthtml.core.FastHTML.setup_ws': ('api/core.html#fasthtml.setup_ws', 'fasthtml/core.py'),
@@ -79,6 +107,9 @@ d = { 'settings': { 'branch': 'main',
                                'fasthtml.core.HttpHeader': ('api/core.html#httpheader', 'fasthtml/core.py'),
                                'fasthtml.core.JSONResponse': ('api/core.html#jsonresponse', 'fasthtml/core.py'),
                                'fasthtml.core.JSONResponse.render': ('api/core.html#jsonresponse.render', 'fasthtml/core.py'),
+                               'fasthtml.core.Lazy': ('api/core.html#lazy', 'fasthtml/core.py'),
+                               'fasthtml.core.Lazy.__ft__': ('api/core.html#lazy.__ft__', 'fasthtml/core.py'),
+                               'fasthtml.core.Lazy.__init__': ('api/core.html#lazy.__init__', 'fasthtml/core.py'),
                                'fasthtml.core.Lifespan': ('api/core.html#lifespan', 'fasthtml/core.py'),
                                'fasthtml.core.Lifespan.__call__': ('api/core.html#lifespan.__call__', 'fasthtml/core.py'),
                                'fasthtml.core.Lifespan.__init__': ('api/core.html#lifespan.__init__', 'fasthtml/core.py'),
@@ -86,9 +117,22 @@ d = { 'settings': { 'branch': 'main',
                                'fasthtml.core.Lifespan.on_event': ('api/core.html#lifespan.on_event', 'fasthtml/core.py'),
                                'fasthtml.core.MiddlewareBase': ('api/core.html#middlewarebase', 'fasthtml/core.py'),
                                'fasthtml.core.MiddlewareBase.__call__': ('api/core.html#middlewarebase.__call__', 'fasthtml/core.py'),
+                               'fasthtml.core.ProcessPool': ('api/core.html#processpool', 'fasthtml/core.py'),
+                               'fasthtml.core.ProcessPool.__init__': ('api/core.html#processpool.__init__', 'fasthtml/core.py'),
+                               'fasthtml.core.ProcessPool._call': ('api/core.html#processpool._call', 'fasthtml/core.py'),
+                               'fasthtml.core.ProcessPool._get_pool': ('api/core.html#processpool._get_pool', 'fasthtml/core.py'),
+                               'fasthtml.core.ProcessPool.stats': ('api/core.html#processpool.stats', 'fasthtml/core.py'),
+                               'fasthtml.core.ProcessPool.warm': ('api/core.html#processpool.warm', 'fasthtml/core.py'),
                                'fasthtml.core.Redirect': ('api/core.html#redirect', 'fasthtml/core.py'),
                                'fasthtml.core.Redirect.__init__': ('api/core.html#redirect.__init__', 'fasthtml/core.py'),
                                'fasthtml.core.Redirect.__response__': ('api/core.html#redirect.__response__', 'fasthtml/core.py'),
+                               'fasthtml.core.ResumableUpload': ('api/core.html#resumableupload', 'fasthtml/core.py'),
+                               'fasthtml.core.ResumableUpload.__init__': ('api/core.html#resumableupload.__init__', 'fasthtml/core.py'),
+                               'fasthtml.core.ResumableUpload._part': ('api/core.html#resumableupload._part', 'fasthtml/core.py'),
+                               'fasthtml.core.ResumableUpload._save': ('api/core.html#resumableupload._save', 'fasthtml/core.py'),
+                               'fasthtml.core.ResumableUpload.handle': ('api/core.html#resumableupload.handle', 'fasthtml/core.py'),
+                               'fasthtml.core.ResumableUpload.mount': ('api/core.html#resumableupload.mount', 'fasthtml/core.py'),
+                               'fasthtml.core.ResumableUpload.offset': ('api/core.html#resumableupload.offset', 'fasthtml/core.py'),
                                'fasthtml.core.RouteFuncs': ('api/core.html#routefuncs', 'fasthtml/core.py'),
                                'fasthtml.core.RouteFuncs.__dir__': ('api/core.html#routefuncs.__dir__', 'fasthtml/core.py'),
                                'fasthtml.core.RouteFuncs.__getattr__': ('api/core.html#routefuncs.__getattr__', 'fasthtml/core.py'),
@@ -101,16 +145,54 @@ d = { 'settings': { 'branch': 'main',
                                'fasthtml.core.StaticNoCache.file_response': ( 'api/core.html#staticnocache.file_response',
                                                                               'fasthtml/core.py'),
                                'fasthtml.core.StringConvertor.to_string': ('api/core.html#stringconvertor.to_string', 'fasthtml/core.py'),
+                               'fasthtml.core.UploadPart': ('api/core.html#uploadpart', 'fasthtml/core.py'),
+                               'fasthtml.core.UploadPart.__aiter__': ('api/core.html#uploadpart.__aiter__', 'fasthtml/core.py'),
+                               'fasthtml.core.UploadPart.__init__': ('api/core.html#uploadpart.__init__', 'fasthtml/core.py'),
+                               'fasthtml.core.UploadPart.__repr__': ('api/core.html#uploadpart.__repr__', 'fasthtml/core.py'),
+                               'fasthtml.core.UploadPart.read': ('api/core.html#uploadpart.read', 'fasthtml/core.py'),
+                               'fasthtml.core.UploadStream': ('api/core.html#uploadstream', 'fasthtml/core.py'),
+                               'fasthtml.core.UploadStream.__aiter__': ('api/core.html#uploadstream.__aiter__', 'fasthtml/core.py'),
+                               'fasthtml.core.UploadStream.__init__': ('api/core.html#uploadstream.__init__', 'fasthtml/core.py'),
+                               'fasthtml.core.UploadStream._next': ('api/core.html#uploadstream._next', 'fasthtml/core.py'),
+                               'fasthtml.core._BodyCtor': ('api/core.html#_bodyctor', 'fasthtml/core.py'),
+                               'fasthtml.core._BodyCtor.__call__': ('api/core.html#_bodyctor.__call__', 'fasthtml/core.py'),
+                               'fasthtml.core._BodyCtor.__init__': ('api/core.html#_bodyctor.__init__', 'fasthtml/core.py'),
+                               'fasthtml.core._FTStream': ('api/core.html#_ftstream', 'fasthtml/core.py'),
+                               'fasthtml.core._FTStream.__call__': ('api/core.html#_ftstream.__call__', 'fasthtml/core.py'),
+                               'fasthtml.core._FTStream.__init__': ('api/core.html#_ftstream.__init__', 'fasthtml/core.py'),
+                               'fasthtml.core._FTStream._body': ('api/core.html#_ftstream._body', 'fasthtml/core.py'),
+                               'fasthtml.core._FTStream._start': ('api/core.html#_ftstream._start', 'fasthtml/core.py'),
+                               'fasthtml.core._LazyFT': ('api/core.html#_lazyft', 'fasthtml/core.py'),
+                               'fasthtml.core._LazyFT.__ft__': ('api/core.html#_lazyft.__ft__', 'fasthtml/core.py'),
+                               'fasthtml.core._LazyFT.__init__': ('api/core.html#_lazyft.__init__', 'fasthtml/core.py'),
+                               'fasthtml.core._LazyFT.build': ('api/core.html#_lazyft.build', 'fasthtml/core.py'),
                                'fasthtml.core._LifespanCtx': ('api/core.html#_lifespanctx', 'fasthtml/core.py'),
                                'fasthtml.core._LifespanCtx.__aenter__': ('api/core.html#_lifespanctx.__aenter__', 'fasthtml/core.py'),
                                'fasthtml.core._LifespanCtx.__aexit__': ('api/core.html#_lifespanctx.__aexit__', 'fasthtml/core.py'),
                                'fasthtml.core._LifespanCtx.__aiter__': ('api/core.html#_lifespanctx.__aiter__', 'fasthtml/core.py'),
                                'fasthtml.core._LifespanCtx.__anext__': ('api/core.html#_lifespanctx.__anext__', 'fasthtml/core.py'),
                                'fasthtml.core._LifespanCtx.__init__': ('api/core.html#_lifespanctx.__init__', 'fasthtml/core.py'),
+                               'fasthtml.core._Provider': ('api/core.html#_provider', 'fasthtml/core.py'),
+                               'fasthtml.core._Provider.__call__': ('api/core.html#_provider.__call__', 'fasthtml/core.py'),
+                               'fasthtml.core._Provider.__init__': ('api/core.html#_provider.__init__', 'fasthtml/core.py'),
+                               'fasthtml.core._WSSession': ('api/core.html#_wssession', 'fasthtml/core.py'),
+                               'fasthtml.core._WSSession.__init__': ('api/core.html#_wssession.__init__', 'fasthtml/core.py'),
+                               'fasthtml.core._WSSession.attach': ('api/core.html#_wssession.attach', 'fasthtml/core.py'),
+                               'fasthtml.core._WSSession.send': ('api/core.html#_wssession.send', 'fasthtml/core.py'),
                                'fasthtml.core._add_ids': ('api/core.html#_add_ids', 'fasthtml/core.py'),
                                'fasthtml.core._annotations': ('api/core.html#_annotations', 'fasthtml/core.py'),
+                               'fasthtml.core._awaitables': ('api/core.html#_awaitables', 'fasthtml/core.py'),
+                               'fasthtml.core._body_ctor': ('api/core.html#_body_ctor', 'fasthtml/core.py'),
+                               'fasthtml.core._body_decoder': ('api/core.html#_body_decoder', 'fasthtml/core.py'),
+                               'fasthtml.core._call_latest': ('api/core.html#_call_latest', 'fasthtml/core.py'),
+                               'fasthtml.core._call_timeout': ('api/core.html#_call_timeout', 'fasthtml/core.py'),
                                'fasthtml.core._canonical': ('api/core.html#_canonical', 'fasthtml/core.py'),
                                'fasthtml.core._check_anno': ('api/core.html#_check_anno', 'fasthtml/core.py'),
+                               'fasthtml.core._conv': ('api/core.html#_conv', 'fasthtml/core.py'),
+                               'fasthtml.core._converter': ('api/core.html#_converter', 'fasthtml/core.py'),
+                               'fasthtml.core._defer_stream': ('api/core.html#_defer_stream', 'fasthtml/core.py'),
+                               'fasthtml.core._deferreds': ('api/core.html#_deferreds', 'fasthtml/core.py'),
+                               'fasthtml.core._enum_conv': ('api/core.html#_enum_conv', 'fasthtml/core.py'),
                                'fasthtml.core._find_p': ('api/core.html#_find_p', 'fasthtml/core.py'),
                                'fasthtml.core._find_ps': ('api/core.html#_find_ps', 'fasthtml/core.py'),
                                'fasthtml.core._find_targets': ('api/core.html#_find_targets', 'fasthtml/core.py'),
@@ -118,18 +200,37 @@ d = { 'settings': { 'branch': 'main',
                                'fasthtml.core._form_arg': ('api/core.html#_form_arg', 'fasthtml/core.py'),
                                'fasthtml.core._formitem': ('api/core.html#_formitem', 'fasthtml/core.py'),
                                'fasthtml.core._from_body': ('api/core.html#_from_body', 'fasthtml/core.py'),
+                               'fasthtml.core._ft_key': ('api/core.html#_ft_key', 'fasthtml/core.py'),
                                'fasthtml.core._get_htmx': ('api/core.html#_get_htmx', 'fasthtml/core.py'),
                                'fasthtml.core._handle': ('api/core.html#_handle', 'fasthtml/core.py'),
+                               'fasthtml.core._idem_key': ('api/core.html#_idem_key', 'fasthtml/core.py'),
+                               'fasthtml.core._idempotent': ('api/core.html#_idempotent', 'fasthtml/core.py'),
+                               'fasthtml.core._is_async_ft': ('api/core.html#_is_async_ft', 'fasthtml/core.py'),
                                'fasthtml.core._is_body': ('api/core.html#_is_body', 'fasthtml/core.py'),
                                'fasthtml.core._is_ft_resp': ('api/core.html#_is_ft_resp', 'fasthtml/core.py'),
+                               'fasthtml.core._limit_body': ('api/core.html#_limit_body', 'fasthtml/core.py'),
                                'fasthtml.core._list': ('api/core.html#_list', 'fasthtml/core.py'),
                                'fasthtml.core._mk_list': ('api/core.html#_mk_list', 'fasthtml/core.py'),
                                'fasthtml.core._mk_locfunc': ('api/core.html#_mk_locfunc', 'fasthtml/core.py'),
                                'fasthtml.core._params': ('api/core.html#_params', 'fasthtml/core.py'),
                                'fasthtml.core._part_resp': ('api/core.html#_part_resp', 'fasthtml/core.py'),
+                               'fasthtml.core._proc_call': ('api/core.html#_proc_call', 'fasthtml/core.py'),
+                               'fasthtml.core._proc_ref': ('api/core.html#_proc_ref', 'fasthtml/core.py'),
+                               'fasthtml.core._reap_idle': ('api/core.html#_reap_idle', 'fasthtml/core.py'),
+                               'fasthtml.core._replay': ('api/core.html#_replay', 'fasthtml/core.py'),
+                               'fasthtml.core._resolve_aws': ('api/core.html#_resolve_aws', 'fasthtml/core.py'),
+                               'fasthtml.core._resolve_defs': ('api/core.html#_resolve_defs', 'fasthtml/core.py'),
                                'fasthtml.core._resp': ('api/core.html#_resp', 'fasthtml/core.py'),
                                'fasthtml.core._route_pn': ('api/core.html#_route_pn', 'fasthtml/core.py'),
+                               'fasthtml.core._select_ft': ('api/core.html#_select_ft', 'fasthtml/core.py'),
                                'fasthtml.core._send_ws': ('api/core.html#_send_ws', 'fasthtml/core.py'),
+                               'fasthtml.core._sess_id': ('api/core.html#_sess_id', 'fasthtml/core.py'),
+                               'fasthtml.core._sse_watch': ('api/core.html#_sse_watch', 'fasthtml/core.py'),
+                               'fasthtml.core._str2date': ('api/core.html#_str2date', 'fasthtml/core.py'),
+                               'fasthtml.core._str2decimal': ('api/core.html#_str2decimal', 'fasthtml/core.py'),
+                               'fasthtml.core._sub_aws': ('api/core.html#_sub_aws', 'fasthtml/core.py'),
+                               'fasthtml.core._supersede_key': ('api/core.html#_supersede_key', 'fasthtml/core.py'),
+                               'fasthtml.core._target_ids': ('api/core.html#_target_ids', 'fasthtml/core.py'),
                                'fasthtml.core._to_htmx_header': ('api/core.html#_to_htmx_header', 'fasthtml/core.py'),
                                'fasthtml.core._to_xml': ('api/core.html#_to_xml', 'fasthtml/core.py'),
                                'fasthtml.core._url_for': ('api/core.html#_url_for', 'fasthtml/core.py'),
@@ -140,9 +241,14 @@ d = { 'settings': { 'branch': 'main',
                                'fasthtml.core._wrap_req': ('api/core.html#_wrap_req', 'fasthtml/core.py'),
                                'fasthtml.core._wrap_ws': ('api/core.html#_wrap_ws', 'fasthtml/core.py'),
                                'fasthtml.core._ws_endp': ('api/core.html#_ws_endp', 'fasthtml/core.py'),
+                               'fasthtml.core._ws_loads': ('api/core.html#_ws_loads', 'fasthtml/core.py'),
+                               'fasthtml.core._ws_send_str': ('api/core.html#_ws_send_str', 'fasthtml/core.py'),
+                               'fasthtml.core._ws_tok_ok': ('api/core.html#_ws_tok_ok', 'fasthtml/core.py'),
                                'fasthtml.core._xt_cts': ('api/core.html#_xt_cts', 'fasthtml/core.py'),
+                               'fasthtml.core._zstd_decoder': ('api/core.html#_zstd_decoder', 'fasthtml/core.py'),
                                'fasthtml.core.add_sig_param': ('api/core.html#add_sig_param', 'fasthtml/core.py'),
                                'fasthtml.core.cancel_on_disconnect': ('api/core.html#cancel_on_disconnect', 'fasthtml/core.py'),
+                               'fasthtml.core.coalesce': ('api/core.html#coalesce', 'fasthtml/core.py'),
                                'fasthtml.core.cookie': ('api/core.html#cookie', 'fasthtml/core.py'),
                                'fasthtml.core.decode_uri': ('api/core.html#decode_uri', 'fasthtml/core.py'),
                                'fasthtml.core.def_hdrs': ('api/core.html#def_hdrs', 'fasthtml/core.py'),
@@ -154,20 +260,29 @@ d = { 'settings': { 'branch': 'main',
                                'fasthtml.core.into.__call__': ('api/core.html#into.__call__', 'fasthtml/core.py'),
                                'fasthtml.core.into.__init__': ('api/core.html#into.__init__', 'fasthtml/core.py'),
                                'fasthtml.core.is_full_page': ('api/core.html#is_full_page', 'fasthtml/core.py'),
+                               'fasthtml.core.lazy_ft': ('api/core.html#lazy_ft', 'fasthtml/core.py'),
                                'fasthtml.core.nested_name': ('api/core.html#nested_name', 'fasthtml/core.py'),
                                'fasthtml.core.noop_body': ('api/core.html#noop_body', 'fasthtml/core.py'),
                                'fasthtml.core.parse_form': ('api/core.html#parse_form', 'fasthtml/core.py'),
                                'fasthtml.core.parsed_date': ('api/core.html#parsed_date', 'fasthtml/core.py'),
                                'fasthtml.core.qp': ('api/core.html#qp', 'fasthtml/core.py'),
                                'fasthtml.core.reg_re_param': ('api/core.html#reg_re_param', 'fasthtml/core.py'),
+                               'fasthtml.core.register_converter': ('api/core.html#register_converter', 'fasthtml/core.py'),
                                'fasthtml.core.respond': ('api/core.html#respond', 'fasthtml/core.py'),
                                'fasthtml.core.serve': ('api/core.html#serve', 'fasthtml/core.py'),
                                'fasthtml.core.signal_shutdown': ('api/core.html#signal_shutdown', 'fasthtml/core.py'),
                                'fasthtml.core.snake2hyphens': ('api/core.html#snake2hyphens', 'fasthtml/core.py'),
+                               'fasthtml.core.throttle': ('api/core.html#throttle', 'fasthtml/core.py'),
+                               'fasthtml.core.throttle.__call__': ('api/core.html#throttle.__call__', 'fasthtml/core.py'),
+                               'fasthtml.core.throttle.__init__': ('api/core.html#throttle.__init__', 'fasthtml/core.py'),
+                               'fasthtml.core.throttle._later': ('api/core.html#throttle._later', 'fasthtml/core.py'),
+                               'fasthtml.core.throttle.close': ('api/core.html#throttle.close', 'fasthtml/core.py'),
+                               'fasthtml.core.throttle.flush': ('api/core.html#throttle.flush', 'fasthtml/core.py'),
                                'fasthtml.core.unqid': ('api/core.html#unqid', 'fasthtml/core.py'),
                                'fasthtml.core.until_disconnect': ('api/core.html#until_disconnect', 'fasthtml/core.py'),
                                'fasthtml.core.uri': ('api/core.html#uri', 'fasthtml/core.py'),
-                               'fasthtml.core.vurl': ('api/core.html#vurl', 'fasthtml/core.py')},
+                               'fasthtml.core.vurl': ('api/core.html#vurl', 'fasthtml/core.py'),
+                               'fasthtml.core.ws_token': ('api/core.html#ws_token', 'fasthtml/core.py')},
             'fasthtml.fastapp': {},
             'fasthtml.ft': {},
             'fasthtml.js': { 'fasthtml.js.HighlightJS': ('api/js.html#highlightjs', 'fasthtml/js.py'),
@@ -195,6 +310,7 @@ d = { 'settings': { 'branch': 'main',
                                   'fasthtml.jupyter.render_ft': ('api/jupyter.html#render_ft', 'fasthtml/jupyter.py'),
                                   'fasthtml.jupyter.show': ('api/jupyter.html#show', 'fasthtml/jupyter.py'),
                                   'fasthtml.jupyter.ws_client': ('api/jupyter.html#ws_client', 'fasthtml/jupyter.py')},
+            'fasthtml.live': {},
             'fasthtml.live_reload': {},
             'fasthtml.oauth': { 'fasthtml.oauth.AppleAppClient': ('api/oauth.html#appleappclient', 'fasthtml/oauth.py'),
                                 'fasthtml.oauth.AppleAppClient.__init__': ('api/oauth.html#appleappclient.__init__', 'fasthtml/oauth.py'),
@@ -264,6 +380,7 @@ d = { 'settings': { 'branch': 'main',
                                'fasthtml.pico.PicoBusy': ('api/pico.html#picobusy', 'fasthtml/pico.py'),
                                'fasthtml.pico.Search': ('api/pico.html#search', 'fasthtml/pico.py'),
                                'fasthtml.pico.set_pico_cls': ('api/pico.html#set_pico_cls', 'fasthtml/pico.py')},
+            'fasthtml.ratelimit': {},
             'fasthtml.starlette': {},
             'fasthtml.stripe_otp': { 'fasthtml.stripe_otp.Payment': ('explains/stripe.html#payment', 'fasthtml/stripe_otp.py'),
                                      'fasthtml.stripe_otp._search_app': ('explains/stripe.html#_search_app', 'fasthtml/stripe_otp.py'),
@@ -333,6 +450,7 @@ d = { 'settings': { 'branch': 'main',
                                 'fasthtml.xtend.Surreal': ('api/xtend.html#surreal', 'fasthtml/xtend.py'),
                                 'fasthtml.xtend.Titled': ('api/xtend.html#titled', 'fasthtml/xtend.py'),
                                 'fasthtml.xtend.YouTubeEmbed': ('api/xtend.html#youtubeembed', 'fasthtml/xtend.py'),
+                                'fasthtml.xtend.chunked_upload_attrs': ('api/xtend.html#chunked_upload_attrs', 'fasthtml/xtend.py'),
                                 'fasthtml.xtend.clear': ('api/xtend.html#clear', 'fasthtml/xtend.py'),
                                 'fasthtml.xtend.double_braces': ('api/xtend.html#double_braces', 'fasthtml/xtend.py'),
                                 'fasthtml.xtend.jsd': ('api/xtend.html#jsd', 'fasthtml/xtend.py'),
@@ -0,0 +1,88 @@
+import asyncio, re, time
+from collections import Counter, OrderedDict
+from fastcore.xml import to_xml
+from fasthtml.core import *
+from fasthtml.starlette import *
+
+crawler_re = r'(?i)bot|crawl|spider|slurp'
+
+# (name, match, share): requests go to the first class whose `match(req)` is true, and are only admitted while in-flight
+# requests and event-loop lag are below `share` of their limits. A share of `None` is never shed.
+default_classes = (
+    ('health',  lambda req: req.url.path in ('/health', '/healthz', '/ping'), None),
+    ('htmx',    lambda req: 'hx-request' in req.headers, 1.0),
+    ('crawler', lambda req: bool(re.search(crawler_re, req.headers.get('user-agent', ''))), 0.5),
+    ('page',    lambda req: True, 0.8))
+
+def _shareable(msg):
+    "Whether response start `msg` is marked with `Cache-Control: public`, so its body can be replayed to any client"
+    cc = {o.strip().split('=')[0].lower() for o in Headers(raw=msg.get('headers', [])).get('cache-control', '').split(',')}
+    return 'public' in cc and not cc & {'private', 'no-store'}
+
+class AdmissionControl:
+    "Shed requests by priority class once in-flight requests or event-loop lag pass their limits"
+    def __init__(self, max_inflight=100, max_lag=0.5, classes=default_classes, fallback=None, retry_after=1, interval=0.1, cache_size=0):
+        self.max_inflight,self.max_lag,self.classes,self.retry_after = max_inflight,max_lag,classes,retry_after
+        self.interval,self.cache_size,self.cache = interval,cache_size,OrderedDict()
+        self.fallback = None if fallback is None else to_xml(fallback)
+        self.inflight,self.lag,self.task = 0,0.,None
+        self.admitted,self.shed = Counter(),Counter()
+
+    @property
+    def middleware(self): return Middleware(AdmissionMiddleware, ctl=self)
+
+    @property
+    def stats(self): return dict(inflight=self.inflight, lag=self.lag, admitted=dict(self.admitted), shed=dict(self.shed))
+
+    async def _monitor(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.lag = max(0., time.monotonic()-start-self.interval)
+
+    def _watch(self):
+        loop = asyncio.get_running_loop()
+        if self.task is None or self.task.done() or self.task.get_loop() is not loop: self.task = loop.create_task(self._monitor())
+
+    def classify(self, req): return next(((n,s) for n,m,s in self.classes if m(req)), (None,1.0))
+
+    def admit(self, share): return share is None or (self.inflight < share*self.max_inflight and self.lag <= share*self.max_lag)
+
+    def shed_response(self, req):
+        hdrs = {'Retry-After': str(self.retry_after)}
+        if 'hx-request' in req.headers:
+            body = self.cache.get(str(req.url), self.fallback)
+            if body is not None: return HTMLResponse(body, headers=hdrs)
+        return Response('Server busy', status_code=503, headers=hdrs)
+
+    def _store(self, key, body):
+        self.cache[key] = body
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size: self.cache.popitem(last=False)
+
+    def _capture(self, req, send):
+        if not self.cache_size or req.method!='GET' or 'hx-request' not in req.headers: return send
+        key,parts = str(req.url),[]
+        async def _send(msg):
+            if msg['type']=='http.response.start': parts.append(msg['status']==200 and _shareable(msg))
+            elif parts and parts[0]:
+                parts.append(msg.get('body', b''))
+                if not msg.get('more_body'): self._store(key, b''.join(parts[1:]))
+            await send(msg)
+        return _send
+
+class AdmissionMiddleware(MiddlewareBase):
+    def __init__(self, app, ctl): self._app,self.ctl = app,ctl
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type']!='http': return await self._app(scope, receive, send)
+        ctl,req = self.ctl,Request(scope)
+        ctl._watch()
+        name,share = ctl.classify(req)
+        if not ctl.admit(share):
+            ctl.shed[name] += 1
+            return await ctl.shed_response(req)(scope, receive, send)
+        ctl.admitted[name] += 1
+        ctl.inflight += 1
+        try: await self._app(scope, receive, ctl._capture(req, send))
+        finally: ctl.inflight -= 1
@@ -6,6 +6,9 @@ from fastcore.utils import *
 from fastcore.xml import *
 from .basics import *
 from .authmw import *
+from .admission import *
+from .ratelimit import *
+from .live import *
 from .live_reload import *
 from .toaster import *
 from .js import *
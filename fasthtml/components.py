@@ -240,7 +240,8 @@ def html2ft(html, attr1st=False):
     return _parse(soup, 1)
 
 # %% ../nbs/api/01_components.ipynb #c6203402
-def sse_message(elm, event='message'):
-    "Convert element `elm` into a format suitable for SSE streaming"
+def sse_message(elm, event='message', id=None):
+    "Convert element `elm` into a format suitable for SSE streaming, optionally stamped with event `id`"
     data = '\n'.join(f'data: {o}' for o in to_xml(elm).splitlines())
-    return f'event: {event}\n{data}\n\n'
+    eid = '' if id is None else f'id: {id}\n'
+    return f'event: {event}\n{eid}{data}\n\n'
@@ -5,17 +5,19 @@ Docs: https://www.fastht.ml/docs/api/core.html.md"""
 # AUTOGENERATED! DO NOT EDIT! File to edit: ../nbs/api/00_core.ipynb.
 
 # %% auto #0
-__all__ = ['empty', 'htmx_hdrs', 'fh_cfg', 'htmx_resps', 'DEF_MAXPART', 'htmx_exts', 'htmxsrc', 'fhjsscr', 'surrsrc', 'scopesrc',
-           'viewport', 'charset', 'cors_allow', 'iframe_scr', 'all_meths', 'devtools_loc', 'parsed_date',
-           'snake2hyphens', 'HtmxHeaders', 'HttpHeader', 'HtmxResponseHeaders', 'form2dict', 'parse_form', 'ApiReturn',
-           'JSONResponse', 'flat_xt', 'Beforeware', 'EventStream', 'signal_shutdown', 'uri', 'decode_uri', 'flat_tuple',
-           'noop_body', 'respond', 'is_full_page', 'Redirect', 'get_key', 'qp', 'def_hdrs', 'Lifespan', 'FastHTML',
-           'HostRoute', 'nested_name', 'serve', 'until_disconnect', 'cancel_on_disconnect', 'Client', 'RouteFuncs',
-           'APIRouter', 'cookie', 'reg_re_param', 'StaticNoCache', 'StaticImmutable', 'vurl', 'add_sig_param', 'into',
-           'MiddlewareBase', 'FtResponse', 'unqid']
+__all__ = ['empty', 'htmx_hdrs', 'fh_cfg', 'htmx_resps', 'DEF_MAXPART', 'conn_stats', 'htmx_exts', 'htmxsrc', 'fhjsscr',
+           'surrsrc', 'scopesrc', 'viewport', 'charset', 'cors_allow', 'iframe_scr', 'all_meths', 'devtools_loc',
+           'parsed_date', 'snake2hyphens', 'HtmxHeaders', 'HttpHeader', 'HtmxResponseHeaders', 'form2dict',
+           'parse_form', 'UploadPart', 'UploadStream', 'register_converter', 'ApiReturn', 'JSONResponse', 'CancelToken',
+           'flat_xt', 'Beforeware', 'Bulkhead', 'ProcessPool', 'EventStream', 'EventChannel', 'throttle', 'coalesce',
+           'signal_shutdown', 'uri', 'decode_uri', 'flat_tuple', 'noop_body', 'respond', 'is_full_page', 'lazy_ft',
+           'Deferred', 'Redirect', 'unqid', 'get_key', 'qp', 'def_hdrs', 'Lifespan', 'FastHTML', 'HostRoute',
+           'nested_name', 'Lazy', 'serve', 'until_disconnect', 'cancel_on_disconnect', 'Client', 'ResumableUpload',
+           'RouteFuncs', 'APIRouter', 'cookie', 'reg_re_param', 'StaticNoCache', 'StaticImmutable', 'vurl',
+           'add_sig_param', 'into', 'MiddlewareBase', 'FtResponse', 'ws_token']
 
 # %% ../nbs/api/00_core.ipynb #23503b9e
-import json,uuid,inspect,types,asyncio,inspect,random,contextlib,itsdangerous,hashlib
+import json,uuid,inspect,types,asyncio,inspect,random,contextlib,itsdangerous,hashlib,collections,time,threading,zlib,contextvars
 from uuid import uuid5, NAMESPACE_URL
 
 from fastcore.utils import *
@@ -26,6 +28,8 @@ from fastcore.style import S
 from types import UnionType, SimpleNamespace as ns, GenericAlias
 from typing import get_args, get_origin, Union, Mapping, List, Any, Callable
 from datetime import datetime,date
+from decimal import Decimal,InvalidOperation
+from enum import Enum
 from dataclasses import dataclass
 from inspect import Parameter,get_annotations
 from functools import partialmethod, update_wrapper
@@ -34,9 +38,13 @@ from urllib.parse import urlencode, parse_qs, quote, unquote, urlsplit, urlunspl
 from copy import deepcopy
 from warnings import warn
 from dateutil import parser as dtparse
-from anyio import from_thread
+from anyio import from_thread, to_thread, CapacityLimiter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from uuid import uuid4, UUID
 from base64 import b64encode,b64decode
+from python_multipart.multipart import MultipartParser, parse_options_header
+from python_multipart.exceptions import MultipartParseError
 from email.utils import format_datetime
 
 from .starlette import *
@@ -48,8 +56,9 @@ empty = Parameter.empty
 
 # %% ../nbs/api/00_core.ipynb #e68a76c9
 def parsed_date(s:str):
-    "Convert `s` to a datetime"
-    return dtparse.parse(s)
+    "Convert `s` to a datetime, using the fast ISO 8601 parser where possible"
+    try: return datetime.fromisoformat(s)
+    except ValueError: return dtparse.parse(s)
 
 # %% ../nbs/api/00_core.ipynb #7c820373
 def snake2hyphens(s:str):
@@ -93,17 +102,47 @@ def _check_anno(arg, anno):
     if isinstance(anno, type) and not get_origin(anno) and issubclass(anno, (list, tuple)) and not _is_body(anno): return f"`{arg}` uses bare `{anno.__name__}` annotation, so is ignored (use e.g. `{anno.__name__}[str]` instead)."
 
 # %% ../nbs/api/00_core.ipynb #0afb520c
-def _fix_anno(t, o):
-    "Create appropriate callable type for casting a `str` to type `t` (or first type in `t` if union)"
+def _str2date(s):
+    if not s: return None
+    try: return date.fromisoformat(s)
+    except ValueError: return dtparse.parse(s).date()
+
+def _str2decimal(s):
+    try: return Decimal(s)
+    except InvalidOperation: raise ValueError(f"Invalid decimal: {s!r}") from None
+
+def _enum_conv(t):
+    "Converter to enum `t` from a member's value, name, or value as a string"
+    def _f(s):
+        if s in t.__members__: return t[s]
+        try: return t(s)
+        except ValueError: return t(type(next(iter(t)).value)(s))
+    return _f
+
+_str_casts = {bool: str2bool, int: str2int, date: _str2date, datetime: parsed_date, Decimal: _str2decimal, UploadFile: noop}
+
+def _converter(t):
+    "Create a function casting a `str` (or the last of a list of them) to type `t` (or first type in `t` if union)"
     origin = get_origin(t)
     if origin is Union or origin is UnionType: origin = get_origin(t:=first(o for o in get_args(t) if o!=type(None)))
     if origin in (list,List): t = first(o for o in get_args(t) if o!=type(None))
-    d = {bool: str2bool, int: str2int, date: str2date, UploadFile: noop}
-    res = d.get(t, t)
-    if origin in (list,List): return _mk_list(res, o)
-    if isinstance(t, type) and issubclass(t, (list,tuple)): return None
-    if not isinstance(o, (str,list,tuple)): return o
-    return res(o[-1]) if isinstance(o,(list,tuple)) else res(o)
+    res = _str_casts.get(t) or (_enum_conv(t) if isinstance(t, type) and issubclass(t, Enum) else t)
+    if origin in (list,List): return partial(_mk_list, res)
+    if isinstance(t, type) and issubclass(t, (list,tuple)): return lambda o: None
+    def _f(o):
+        if not isinstance(o, (str,list,tuple)): return o
+        return res(o[-1]) if isinstance(o,(list,tuple)) else res(o)
+    return _f
+
+_convs = {}
+def _conv(t):
+    "The converter for `t`, created on first use"
+    try: return _convs.get(t) or _convs.setdefault(t, _converter(t))
+    except TypeError: return _converter(t)
+
+def _fix_anno(t, o):
+    "Cast `o` to type `t` using a converter created once per type"
+    return _conv(t)(o)
 
 # %% ../nbs/api/00_core.ipynb #c58ccadb
 def _form_arg(k, v, d):
@@ -161,6 +200,7 @@ DEF_MAXPART = 100*1024*1024
 async def parse_form(req: Request) -> FormData:
     "Starlette errors on empty multipart/json forms, so this checks for that situation"
     ctype = req.headers.get("Content-Type", "")
+    if getattr(req, "stream_body", False): return FormData()
     maxpart = getattr(req, "max_part_size", DEF_MAXPART)
     if ctype.startswith("multipart/form-data"):
         try: boundary = ctype.split("boundary=")[1].strip()
@@ -171,20 +211,164 @@ async def parse_form(req: Request) -> FormData:
     if ctype == 'application/json': return await req.json() if body else {}
     return await req.form(max_part_size=maxpart)
 
+# %% ../nbs/api/00_core.ipynb #cac02409
+class UploadPart:
+    "A file in an `UploadStream`; iterate over it for its chunks as they arrive"
+    def __init__(self, stream, headers):
+        self.stream,self.headers,self.size,self.done = stream,headers,0,False
+        _,opts = parse_options_header(headers.get('content-disposition', ''))
+        self.name = opts.get(b'name', b'').decode()
+        self.filename = opts[b'filename'].decode() if b'filename' in opts else None
+        self.content_type = headers.get('content-type')
+
+    async def __aiter__(self):
+        while not self.done and self.stream.part is self:
+            kind,data = await self.stream._next() or ('end', None)
+            if kind!='data': self.done = True
+            else:
+                self.size += len(data)
+                yield data
+
+    async def read(self, max_size=None):
+        "All remaining chunks of this part, raising a 413 error if larger than `max_size`"
+        res = bytearray()
+        async for chunk in self:
+            res += chunk
+            if max_size and len(res) > max_size: raise HTTPException(413, f"Field {self.name!r} exceeds {max_size} bytes")
+        return bytes(res)
+
+    def __repr__(self): return f"UploadPart(name={self.name!r}, filename={self.filename!r}, size={self.size})"
+
+class UploadStream:
+    "A multipart request body whose files are yielded, with their chunks, as they arrive"
+    max_size,max_field_size = 1024**3,64*1024
+    def __init__(self, req, max_size=None):
+        self.fields,self.size,self.part,self._done,self._events = {},0,None,False,collections.deque()
+        self.max_size = max_size or self.max_size
+        ctype,opts = parse_options_header(req.headers.get('content-type', ''))
+        if ctype!=b'multipart/form-data' or b'boundary' not in opts: raise HTTPException(400, "Invalid form-data: no boundary")
+        if int(req.headers.get('content-length') or 0) > self.max_size: raise HTTPException(413, f"Request body exceeds {self.max_size} bytes")
+        self._hdrs,self._field,self._value = {},b'',b''
+        def _hdr_end():
+            self._hdrs[self._field.decode('latin-1').lower()] = self._value.decode('latin-1')
+            self._field,self._value = b'',b''
+        self._parser = MultipartParser(opts[b'boundary'], dict(
+            on_part_begin=lambda: self._hdrs.clear(),
+            on_header_field=lambda d,s,e: setattr(self, '_field', self._field+d[s:e]),
+            on_header_value=lambda d,s,e: setattr(self, '_value', self._value+d[s:e]),
+            on_header_end=_hdr_end,
+            on_headers_finished=lambda: self._events.append(('part', dict(self._hdrs))),
+            on_part_data=lambda d,s,e: self._events.append(('data', bytes(d[s:e]))),
+            on_part_end=lambda: self._events.append(('end', None))))
+        self._body = req.stream()
+
+    async def _next(self):
+        "The next parser event, reading more of the body as needed; `None` at the end of the body"
+        while not self._events:
+            if self._done: return None
+            chunk = await anext(self._body, b'')
+            self.size += len(chunk)
+            if self.size > self.max_size: raise HTTPException(413, f"Request body exceeds {self.max_size} bytes")
+            self._done = not chunk
+            try: self._parser.write(chunk) if chunk else self._parser.finalize()
+            except MultipartParseError as e: raise HTTPException(400, f"Invalid form-data: {e}") from None
+        return self._events.popleft()
+
+    async def __aiter__(self):
+        while (ev := await self._next()):
+            kind,hdrs = ev
+            if kind!='part': continue  # The rest of a part that wasn't read
+            part = self.part = UploadPart(self, hdrs)
+            if part.filename is not None: yield part
+            else:
+                v = (await part.read(self.max_field_size)).decode()
+                self.fields[part.name] = [*listify(self.fields[part.name]), v] if part.name in self.fields else v
+
+# %% ../nbs/api/00_core.ipynb #befb6431
+def _zstd_decoder():
+    # `zstandard` can't limit the output of a single chunk, so only the stdlib decompressor is used
+    try: from compression.zstd import ZstdDecompressor  # Python 3.14+
+    except ImportError: return None
+    return ZstdDecompressor().decompress
+
+def _body_decoder(enc):
+    "A function decompressing chunks of a body with `Content-Encoding` `enc`, returning at most `n` bytes, or `None` if `enc` isn't supported"
+    if enc=='gzip': return zlib.decompressobj(16+zlib.MAX_WBITS).decompress
+    if enc=='deflate': return zlib.decompressobj().decompress
+    if enc=='zstd': return _zstd_decoder()
+
+def _limit_body(req, max_size=None):
+    "Decode the body of `req` as it's read, raising a 413 error once it exceeds `max_size`"
+    enc = req.headers.get('content-encoding', 'identity').lower()
+    dec = None if enc=='identity' else _body_decoder(enc)
+    if not (dec or max_size): return
+    try: clen = int(req.headers.get('content-length') or 0)
+    except ValueError: raise HTTPException(400, "Invalid Content-Length") from None
+    if max_size and clen > max_size: raise HTTPException(413, f"Request body exceeds {max_size} bytes")
+    limit,size,receive = max_size or DEF_MAXPART,0,req._receive
+    async def _receive():
+        nonlocal size
+        msg = await receive()
+        if msg['type']=='http.request' and (body := msg.get('body')):
+            if dec:
+                # Ask for one byte more than allowed, so a bomb is detected without decompressing it all
+                try: body = dec(body, limit-size+1)
+                except Exception as e: raise HTTPException(400, f"Invalid {enc} body: {e}") from None
+                msg = {**msg, 'body': body}
+            size += len(body)
+            if size > limit: raise HTTPException(413, f"Request body exceeds {limit} bytes")
+        return msg
+    req._receive = _receive
+    if dec:
+        req.scope['headers'] = [(k,v) for k,v in req.scope['headers'] if k not in (b'content-encoding', b'content-length')]
+        req.__dict__.pop('_headers', None)
+
 # %% ../nbs/api/00_core.ipynb #0caedd04
+class _BodyCtor:
+    "Constructor of body type `anno` from form data, with its fields' converters and required fields found once"
+    def __init__(self, anno):
+        self.anno,self.from_req = anno,getattr(anno, '__from_request__', None)
+        if self.from_req:
+            self.params = {k:v for k,v in _params(self.from_req).items() if k != 'cls'}
+            return
+        self.convs = {k:_converter(v) for k,v in _annotations(anno).items() if v}
+        try: sig = inspect.signature(anno).parameters
+        except (TypeError, ValueError): sig = {}
+        self.required = [k for k,p in sig.items() if p.default is empty and p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)]
+
+    async def __call__(self, conn, data):
+        if self.from_req: return await maybe_await(self.from_req(**await _find_ps(conn, data, conn.headers, self.params)))
+        convs,cargs,errs = self.convs,{},[]
+        for k,v in data.items():
+            if convs and k not in convs: continue
+            if v is None or k not in convs: cargs[k] = v
+            else:
+                try: cargs[k] = convs[k](v)
+                except (ValueError, TypeError) as e: errs.append(f'{k}: {e}')
+        errs += [f'{k}: missing' for k in self.required if k not in data]
+        if errs:
+            msg = f"Invalid {getattr(self.anno, '__name__', self.anno)}: {'; '.join(errs)}"
+            raise HTTPException(400, msg) if isinstance(conn, Request) else ValueError(msg)
+        return self.anno(**cargs)
+
+_body_ctors = {}
+def _body_ctor(anno):
+    "The `_BodyCtor` for `anno`, created on first use"
+    if anno not in _body_ctors: _body_ctors[anno] = _BodyCtor(anno)
+    return _body_ctors[anno]
+
 async def _from_body(conn, p, data):
     "Create an instance of the annotated type from pre-parsed `data`"
-    anno = p.annotation
     # param params take precedence
     data = dict(data) | getattr(conn, 'path_params', {})
-    ctor = getattr(anno, '__from_request__', None)
-    if ctor:
-        ps = {k:v for k,v in _params(ctor).items() if k != 'cls'}
-        kwargs = await _find_ps(conn, data, conn.headers, ps)
-        return await maybe_await(ctor(**kwargs))
-    d = _annotations(anno)
-    cargs = {k: _form_arg(k, v, d) for k, v in data.items() if not d or k in d}
-    return anno(**cargs)
+    return await _body_ctor(p.annotation)(conn, data)
+
+# %% ../nbs/api/00_core.ipynb #32a2303e
+def register_converter(typ, f):
+    "Use `f` to convert strings to `typ` in params and body fields, for all apps in this process"
+    _str_casts[typ] = f
+    _convs.clear()
+    _body_ctors.clear()
 
 # %% ../nbs/api/00_core.ipynb #88b6da3f
 class ApiReturn:
@@ -203,16 +387,64 @@ class JSONResponse(JSONResponseOrig):
         return res.encode("utf-8")
 
 
+# %% ../nbs/api/00_core.ipynb #89ef3a34
+class CancelToken:
+    "Signalled when the client disconnects or the `deadline` (a `time.monotonic` time) passes"
+    def __init__(self, deadline=None): self.deadline,self.reason,self._ev = deadline,None,threading.Event()
+
+    def cancel(self, reason='cancelled'):
+        if self.reason is None: self.reason = reason
+        self._ev.set()
+
+    @property
+    def remaining(self): return None if self.deadline is None else max(0., self.deadline-time.monotonic())
+
+    @property
+    def cancelled(self):
+        if not self._ev.is_set() and self.remaining==0: self.cancel('deadline')
+        return self._ev.is_set()
+
+    def wait(self, timeout=None):
+        "Sleep for up to `timeout` seconds, returning `True` as soon as the token is cancelled"
+        rem = self.remaining
+        if rem is not None: timeout = rem if timeout is None else min(timeout, rem)
+        return self._ev.wait(timeout) or self.cancelled
+
+    def check(self):
+        "Raise an `HTTPException` if cancelled"
+        if self.cancelled: raise HTTPException(504 if self.reason=='deadline' else 499, f'Request cancelled: {self.reason}')
+
+    async def watch(self, req):
+        await _wait_disconnect(req)
+        self.cancel('disconnect')
+
+# %% ../nbs/api/00_core.ipynb #52321c14
+class _Provider:
+    "Call `f` with injected params to provide a value, memoized per request (or connection) or for the whole app"
+    def __init__(self, f, scope='request'):
+        assert scope in ('request','app'), "`scope` must be 'request' or 'app'"
+        self.f,self.scope,self.params,self.cache = f,scope,_params(f),{}
+
+    async def __call__(self, conn, data, hdrs):
+        cache = self.cache if self.scope=='app' else conn.scope.setdefault('fh_provided', {})
+        if self not in cache: cache[self] = await _handle(self.f, **await _find_ps(conn, data, hdrs, self.params))
+        return cache[self]
+
 # %% ../nbs/api/00_core.ipynb #5fa96e3a
 async def _find_p(conn, data, hdrs, arg:str, p:Parameter):
     "In `data` find param named `arg` of type in `p` (`arg` is ignored for body types)"
     anno = p.annotation
+    # Types with a registered provider
+    provs = getattr(conn.scope.get('app'), 'providers', {})
+    if anno in provs: return await provs[anno](conn, data, hdrs)
     # Special annotation types
     if isinstance(anno, type) and not isinstance(anno, GenericAlias):
         if issubclass(anno, HtmxHeaders): return _get_htmx(hdrs)
         if issubclass(anno, Starlette): return conn.scope['app']
         if issubclass(anno, HTTPConnection): return conn
         if issubclass(anno, State): return conn.scope['app'].state
+        if issubclass(anno, CancelToken): return CancelToken(getattr(conn, 'deadline', None))
+        if issubclass(anno, UploadStream): return anno(conn)
         if anno is dict: return data
         if _is_body(anno):
             if 'session'.startswith(arg.lower()): return conn.scope.get('session', {})
@@ -230,7 +462,7 @@ async def _find_p(conn, data, hdrs, arg:str, p:Parameter):
         if arg.lower()=='auth': return conn.scope.get('auth', None)
         if arg.lower()=='send':
             assert not isinstance(conn, Request), "`send` requires a websocket, not a `Request`"
-            return partial(_send_ws, conn)
+            return getattr(conn, 'fh_send', None) or partial(_send_ws, conn)
         if arg.lower()=='api': return ApiReturn(hdrs.get('accept')=='application/json')
         if arg.lower()=='body': return (await conn.body()).decode()
         if arg.lower() in ('hdrs','ftrs','bodykw','htmlkw'): return getattr(conn, arg.lower())
@@ -281,43 +513,304 @@ class Beforeware:
 async def _handle(f, *args, **kwargs):
     return (await f(*args, **kwargs)) if is_async_callable(f) else await run_in_threadpool(f, *args, **kwargs)
 
+# %% ../nbs/api/00_core.ipynb #31ba37d0
+class Bulkhead:
+    "Run sync functions in threads limited to `capacity` at once, rejecting calls once `queue` are waiting"
+    def __init__(self, capacity=10, queue=None):
+        self.limiter,self.queue = CapacityLimiter(capacity),queue
+        self.pending,self.calls,self.rejected = 0,0,0
+
+    async def run(self, f, *args, **kwargs):
+        if self.queue is not None and self.pending-self.limiter.total_tokens >= self.queue:
+            self.rejected += 1
+            raise HTTPException(503, 'Server busy')
+        self.pending += 1
+        self.calls += 1
+        try: return await self._call(f, args, kwargs)
+        finally: self.pending -= 1
+
+    async def _call(self, f, args, kwargs): return await to_thread.run_sync(partial(f, *args, **kwargs), limiter=self.limiter)
+
+    @property
+    def stats(self):
+        cap,used = self.limiter.total_tokens,self.limiter.borrowed_tokens
+        return dict(capacity=cap, in_use=used, waiting=max(0, self.pending-cap), calls=self.calls, rejected=self.rejected)
+
+# %% ../nbs/api/00_core.ipynb #bb540ba1
+def _proc_ref(f):
+    "`f` if pickle can find it by name, or else its module and qualname, such as for functions whose name was rebound by `@rt`"
+    try: o = reduce(getattr, f.__qualname__.split('.'), sys.modules[f.__module__])
+    except (AttributeError, KeyError): return f
+    return f if o is f else (f.__module__, f.__qualname__)
+
+def _proc_call(f, args, kwargs, render):
+    "Call `f` (or the function it names) in a worker process, rendering FT results to HTML if `render`"
+    if isinstance(f, tuple): f = inspect.unwrap(reduce(getattr, f[1].split('.'), __import__(f[0], fromlist=['_'])))
+    res = f(*args, **kwargs)
+    if not render or not isinstance(res, (FT,tuple,list)): return res
+    keep = 'title','meta','link','style','base','html'
+    return tuple(Safe(to_xml(o, indent=fh_cfg.indent)) if isinstance(o, FT) and o.tag not in keep else o for o in tuplify(res))
+
+class ProcessPool(Bulkhead):
+    "Run picklable sync functions in `workers` processes, replacing the pool if a worker crashes"
+    def __init__(self, workers=None, queue=None, render=True, mp_context=None):
+        super().__init__(workers or os.cpu_count(), queue)
+        self.workers,self.render,self.mp_context = self.limiter.total_tokens,render,mp_context
+        self.pool,self.crashed = None,0
+
+    def _get_pool(self):
+        if self.pool is None: self.pool = ProcessPoolExecutor(self.workers, mp_context=self.mp_context)
+        return self.pool
+
+    def warm(self):
+        "Start the worker processes now, rather than on first use"
+        list(self._get_pool().map(noop, range(self.workers)))
+
+    async def _call(self, f, args, kwargs):
+        pool = self._get_pool()
+        async with self.limiter:
+            try: return await asyncio.wrap_future(pool.submit(_proc_call, _proc_ref(f), args, kwargs, self.render))
+            except BrokenProcessPool:
+                if self.pool is pool: self.pool,self.crashed = None,self.crashed+1
+                pool.shutdown(wait=False)
+                raise HTTPException(500, 'Worker process crashed')
+
+    @property
+    def stats(self): return {**super().stats, 'crashed': self.crashed}
+
 # %% ../nbs/api/00_core.ipynb #ad0f0e87
 async def _wrap_ws(ws, data, params):
     hdrs = Headers({k.lower():v for k,v in data.pop('HEADERS', {}).items() if v is not None})
     return await _find_ps(ws, data, hdrs, params)
 
+# %% ../nbs/api/00_core.ipynb #37d5c140
+conn_stats = collections.Counter()
+
+# %% ../nbs/api/00_core.ipynb #c0902b72
+async def _reap_idle(ws, idle):
+    "Close `ws` once no message has been sent or received for `idle` seconds"
+    while (wait := ws.fh_last + idle - time.monotonic()) > 0: await asyncio.sleep(wait)
+    conn_stats['ws_reaped'] += 1
+    await ws.close(1001)
+
 # %% ../nbs/api/00_core.ipynb #dcc15129
+def _ws_loads(data):
+    "Decode an incoming message: JSON as text or bytes, or msgpack bytes"
+    if isinstance(data, bytes) and data[:1] not in (b'{', b'['):
+        try: import msgpack
+        except ImportError: raise ValueError("Binary messages must be JSON unless `msgpack` is installed") from None
+        return msgpack.unpackb(data)
+    return loads(data)
+
+async def _ws_send_str(ws, s):
+    "Send `s` as a text frame, or as UTF-8 bytes if `ws` is a binary route"
+    ws.fh_last = time.monotonic()
+    await (ws.send_bytes(s.encode()) if getattr(ws, 'binary', False) else ws.send_text(s))
+
 async def _send_ws(ws, resp):
     if not resp: return
-    res = to_xml(resp, indent=fh_cfg.indent)
-    await ws.send_text(res)
-
-def _ws_endp(recv, conn=None, disconn=None):
-    cls = type('WS_Endp', (WebSocketEndpoint,), {"encoding":"text"})
+    indent = getattr(ws, 'indent', None)
+    res = to_xml(resp, indent=fh_cfg.indent if indent is None else indent)
+    await _ws_send_str(ws, res)
+
+class _WSSession:
+    "Outgoing frames of a resumable websocket, buffered while its client is disconnected"
+    def __init__(self, maxlen): self.ws,self.buf,self.reaper = None,collections.deque(maxlen=maxlen),None
+
+    async def send(self, resp):
+        if not resp: return
+        if self.ws is not None:
+            try: return await _send_ws(self.ws, resp)
+            except (RuntimeError, WebSocketDisconnect): self.ws = None
+        self.buf.append(resp)
+
+    async def attach(self, ws):
+        "Make `ws` the live connection, replaying buffered frames; returns False if any were dropped"
+        if self.reaper: self.reaper.cancel()
+        intact = len(self.buf) < self.buf.maxlen
+        if not intact: self.buf.clear()
+        self.ws = ws
+        while self.buf: await _send_ws(ws, self.buf.popleft())
+        return intact
+
+def _ws_endp(recv, conn=None, disconn=None, binary=False, indent=None, resume=None, maxlen=100, idle=None):
+    cls = type('WS_Endp', (WebSocketEndpoint,), {"encoding":None if binary else "text"})
+    sessions = {}
 
     async def _generic_handler(handler, ws, data=None):
+        ws.binary,ws.indent = binary,indent
         try:
-            wd = await _wrap_ws(ws, loads(data) if data else {}, _params(handler))
+            wd = await _wrap_ws(ws, _ws_loads(data) if data else {}, _params(handler))
             resp = await _handle(handler, **wd)
             if resp: await _send_ws(ws, resp)
-        except ValueError as e: await ws.send_text(str(e))
+        except ValueError as e: await _ws_send_str(ws, str(e))
 
     async def _connect(self, ws):
         await ws.accept()
-        await _generic_handler(conn, ws)
-
-    async def _disconnect(self, ws, close_code): await _generic_handler(disconn, ws)
-    async def _recv(self, ws, data): await _generic_handler(recv, ws, data)
-
-    if    conn: cls.on_connect    = _connect
-    if disconn: cls.on_disconnect = _disconnect
-    cls.on_receive = _recv
+        tok = ws.query_params.get('ws_token') if resume else None
+        if tok and (not _ws_tok_ok(ws, tok) or getattr(sessions.get(tok), 'ws', None) is not None):
+            # Forged, from another session, or already in use by a live connection; rejected before it's counted
+            ws.fh_rejected = True
+            return await ws.close(1008)
+        conn_stats['ws'] += 1
+        ws.binary,ws.indent,ws.resumed,ws.fh_last = binary,indent,False,time.monotonic()
+        if idle: ws.fh_idle = asyncio.ensure_future(_reap_idle(ws, idle))
+        if tok:
+            resumed = tok in sessions
+            sess = ws.fh_sess = sessions.setdefault(tok, _WSSession(maxlen))
+            ws.fh_send = sess.send
+            ws.resumed = await sess.attach(ws) and resumed
+        if conn: await _generic_handler(conn, ws)
+
+    async def _disconnect(self, ws, close_code):
+        if getattr(ws, 'fh_rejected', False): return
+        conn_stats['ws'] -= 1
+        if idle: ws.fh_idle.cancel()
+        sess = getattr(ws, 'fh_sess', None)
+        if sess is None:
+            if disconn: await _generic_handler(disconn, ws)
+            return
+        if sess.ws is not ws: return
+        sess.ws = None
+        async def _expire():
+            await asyncio.sleep(resume)
+            sessions.pop(ws.query_params['ws_token'], None)
+            if disconn: await _generic_handler(disconn, ws)
+        sess.reaper = asyncio.ensure_future(_expire())
+
+    async def _recv(self, ws, data):
+        ws.fh_last = time.monotonic()
+        await _generic_handler(recv, ws, data)
+
+    cls.on_connect,cls.on_disconnect,cls.on_receive = _connect,_disconnect,_recv
     return cls
 
 # %% ../nbs/api/00_core.ipynb #5b0e7677
-def EventStream(s):
-    "Create a text/event-stream response from `s`"
-    return StreamingResponse(s, media_type="text/event-stream")
+async def _sse_watch(s, ping=None, idle=None):
+    "Yield from `s`, adding a comment every `ping` seconds it is quiet, and stopping once quiet for `idle` seconds"
+    it = aiter(s) if hasattr(s, '__aiter__') else iterate_in_threadpool(s)
+    conn_stats['sse'] += 1
+    nxt,last = None,time.monotonic()
+    try:
+        while True:
+            if nxt is None: nxt = asyncio.ensure_future(anext(it))
+            wait = ping
+            if idle: wait = max(0, min(wait or idle, last+idle-time.monotonic()))
+            done,_ = await asyncio.wait({nxt}, timeout=wait)
+            if nxt in done:
+                try: o = nxt.result()
+                except StopAsyncIteration: return
+                nxt,last = None,time.monotonic()
+                yield o
+            elif idle and time.monotonic()-last >= idle:
+                conn_stats['sse_reaped'] += 1
+                return
+            else: yield ': ping\n\n'
+    finally:
+        conn_stats['sse'] -= 1
+        if nxt is not None: nxt.cancel()
+
+def EventStream(s, ping=None, idle=None):
+    "Create a text/event-stream response from `s`, with optional keep-alive `ping` and `idle` timeout in seconds"
+    return StreamingResponse(_sse_watch(s, ping, idle), media_type="text/event-stream")
+
+# %% ../nbs/api/00_core.ipynb #831e10d9
+class EventChannel:
+    "Broadcast id-stamped SSE messages, replaying missed messages to reconnecting clients"
+    def __init__(self, maxlen=100):
+        self.maxlen,self.sid,self.n = maxlen,uuid4().hex[:12],0
+        self.buf,self.subs = collections.deque(maxlen=maxlen),set()
+
+    def publish(self, elm, event='message'):
+        "Send `elm` to all subscribers, returning its event id"
+        from fasthtml.components import sse_message
+        self.n += 1
+        eid = f'{self.sid}-{self.n}'
+        msg = sse_message(elm, event, id=eid)
+        self.buf.append((self.n, msg))
+        for q in list(self.subs):
+            try: q.put_nowait(msg)
+            except asyncio.QueueFull:
+                self.subs.discard(q)
+                q.get_nowait()
+                q.put_nowait(None)
+        return eid
+
+    def _missed(self, last_id):
+        from fasthtml.components import sse_message
+        if not last_id: return []
+        sid,_,n = last_id.rpartition('-')
+        first = self.buf[0][0] if self.buf else self.n+1
+        if sid!=self.sid or not n.isdigit() or int(n)<first-1: return [sse_message('resync', 'resync')]
+        return [msg for i,msg in self.buf if i>int(n)]
+
+    async def subscribe(self, req=None, last_id=None):
+        "Async generator of messages published after `last_id` (by default, from `req`'s `Last-Event-ID` header)"
+        if last_id is None and req is not None: last_id = req.headers.get('last-event-id')
+        q = asyncio.Queue(self.maxlen)
+        self.subs.add(q)
+        try:
+            for msg in self._missed(last_id): yield msg
+            while (msg := await q.get()) is not None: yield msg
+        finally: self.subs.discard(q)
+
+    def stream(self, req):
+        "An `EventStream` response subscribed to this channel"
+        return EventStream(self.subscribe(req))
+
+# %% ../nbs/api/00_core.ipynb #b5a9498b
+def _ft_key(o): return getattr(o, 'id', None) or id(o)
+
+class throttle:
+    "Wrap async `send` so fragments are coalesced by `key` and flushed at most every `interval` seconds"
+    def __init__(self, send, interval=0.1, key=None):
+        self.send,self.interval,self.key = send,interval,key or _ft_key
+        self.pending,self.task = {},None
+
+    async def __call__(self, *fts):
+        for o in flat_xt(fts): self.pending[self.key(o)] = o
+        if self.task is None or self.task.done():
+            if self.task is not None: self.task.result()  # Re-raise errors from the last send
+            self.task = asyncio.ensure_future(self._later())
+
+    async def _later(self):
+        # Keep going while fragments arrive during `send`, so the latest value is always delivered
+        while self.pending:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def flush(self):
+        "Send pending fragments now"
+        if not self.pending: return
+        fts,self.pending = tuple(self.pending.values()),{}
+        await self.send(fts)
+
+    async def close(self, flush=True):
+        "Stop the background task, re-raising any error from it, then send pending fragments (or drop them if not `flush`)"
+        task,self.task = self.task,None
+        if task is not None:
+            task.cancel()
+            try: await task
+            except asyncio.CancelledError: pass
+        if flush: await self.flush()
+        else: self.pending = {}
+
+# %% ../nbs/api/00_core.ipynb #ccca3272
+async def coalesce(src, interval=0.1, key=None):
+    "Yield tuples of the latest item per `key` from async iterable `src`, batched every `interval` seconds"
+    key,pending = key or _ft_key,{}
+    async def _pump():
+        async for o in src: pending[key(o)] = o
+    task = asyncio.ensure_future(_pump())
+    try:
+        while not task.done():
+            await asyncio.wait({task}, timeout=interval)
+            if pending:
+                res = tuple(pending.values())
+                pending.clear()
+                yield res
+        task.result()
+    finally: task.cancel()
 
 # %% ../nbs/api/00_core.ipynb #0dd0a414
 def signal_shutdown():
@@ -437,6 +930,56 @@ def _part_resp(req, resp):
     if len(resp)==1: resp = resp[0]
     return resp,kw
 
+# %% ../nbs/api/00_core.ipynb #72190d3f
+class _LazyFT:
+    "A call of component `fn` which is only made when it's rendered"
+    def __init__(self, fn, args, kw):
+        self.fn,self.args,self.kw,self.ft = fn,args,kw,None
+        b = inspect.signature(fn).bind(*args, **kw)
+        b.apply_defaults()
+        self.id = b.arguments.get('id', kw.get('id'))
+    def build(self):
+        if self.ft is None: self.ft = self.fn(*self.args, **self.kw)
+        return self.ft
+    def __ft__(self): return self.build()
+
+def lazy_ft(fn):
+    "Decorator making component `fn` lazily constructed, so target-aware responses only build it when its `id` is selected"
+    def _f(*args, **kw): return _LazyFT(fn, args, kw)
+    return update_wrapper(_f, fn)
+
+def _target_ids(req):
+    "Ids in the `HX-Target` header and in `#id` selectors in the `HX-Select` header, and the subset only in `HX-Target`"
+    tgt = {o} if (o := req.headers.get('hx-target')) else set()
+    sels = {o.strip()[1:] for o in req.headers.get('hx-select', '').split(',') if o.strip().startswith('#')}
+    return tgt | sels, tgt - sels
+
+def _select_ft(resp, ids, inner=()):
+    "The elements of FT tree `resp` with an `id` in `ids` (or the children of nested ones in `inner`), and any OOB elements, or `None` if no `id` matched"
+    if not ids: return None
+    found,oob,lazy = [],[],[]
+    def _walk(o, top=False):
+        if isinstance(o, _LazyFT):
+            if o.id in ids: found.append((o.build(), top))
+            else: lazy.append((o, top))
+        elif isinstance(o, FT):
+            if o.get('id') in ids: found.append((o, top))
+            elif o.get('hx-swap-oob'): oob.append(o)
+            else:
+                for c in o.children: _walk(c)
+        elif isinstance(o, (list,tuple)):
+            for c in o: _walk(c, top)
+        elif hasattr(o, '__ft__'): _walk(o.__ft__(), top)
+    _walk(resp, True)
+    # Only build unselected lazy components if the target wasn't found elsewhere
+    while not found and lazy:
+        o,top = lazy.pop(0)
+        _walk(o.build(), top)
+    # A target returned as is (e.g. for an `outerHTML` swap) is sent whole; one nested in a page gets its contents,
+    # since htmx swaps into it. `HX-Select` always picks out the element itself
+    res = [c for o,top in found for c in (o.children if not top and o.get('id') in inner else [o])]
+    return (*res, *oob) if found else None
+
 # %% ../nbs/api/00_core.ipynb #da449a7b
 def _canonical(req):
     if not req.app.canonical: return []
@@ -446,6 +989,8 @@ def _canonical(req):
 def _xt_cts(req, resp):
     "Extract content and headers, render as full page or fragment"
     hdr_tags = 'title','meta','link','style','base'
+    if getattr(req, 'select_target', False) and (sel := _select_ft(resp, *_target_ids(req))) is not None:
+        return _to_xml(req, sel, indent=fh_cfg.indent)
     resp = tuplify(resp)
     heads,bdy = partition(resp, lambda o: getattr(o, 'tag', '') in hdr_tags)
     if not is_full_page(req, resp):
@@ -458,10 +1003,121 @@ def _is_ft_resp(resp):
     "Check if response is a FastTag-compatible type"
     return isinstance(resp, _iter_typs+(HttpHeader,FT)) or hasattr(resp, '__ft__')
 
+# %% ../nbs/api/00_core.ipynb #9b7cb1bc
+def _is_async_ft(o): return inspect.iscoroutinefunction(getattr(type(o), '__ft__', None))
+
+def _awaitables(o, res):
+    "Append `(o, awaitable)` to `res` for each awaitable child, or object with an async `__ft__`, in FT tree `o`"
+    if inspect.isawaitable(o): res.append((o, o))
+    elif _is_async_ft(o): res.append((o, o.__ft__()))
+    elif isinstance(o, FT):
+        for c in o.children: _awaitables(c, res)
+    elif isinstance(o, (list,tuple)):
+        for c in o: _awaitables(c, res)
+    return res
+
+def _sub_aws(o, done):
+    "Replace the objects in FT tree `o` whose `id` is in `done` with their results"
+    if id(o) in done: return done[id(o)]
+    if isinstance(o, FT): o.children = tuple(_sub_aws(c, done) for c in o.children)
+    elif isinstance(o, (list,tuple)): return type(o)(_sub_aws(c, done) for c in o)
+    return o
+
+async def _resolve_aws(o):
+    "Await all awaitable children in FT tree `o` concurrently, along with any awaitables they return"
+    while (aws := _awaitables(o, [])):
+        res = await asyncio.gather(*[aw for _,aw in aws])
+        o = _sub_aws(o, {id(k):r for (k,_),r in zip(aws, res)})
+    return o
+
+# %% ../nbs/api/00_core.ipynb #2955bc2a
+class _FTStream(StreamingResponse):
+    "Chunked HTML response streaming FT yielded by async generator `gen`, sending the head and page shell before the first body chunk"
+    hdr_tags = 'title','meta','link','style','base'
+    def __init__(self, req, gen, status_code=200):
+        self.req,self.gen = req,gen
+        super().__init__(self._body(), status_code=status_code, media_type='text/html', headers={'x-accel-buffering': 'no'})
+
+    async def _start(self):
+        "Collect the leading head tags and HTTP headers, which are needed before anything can be sent"
+        lead,first,req = [],None,self.req
+        async for o in self.gen:
+            if isinstance(o, (HttpHeader,BackgroundTask)) or getattr(o, 'tag', '') in self.hdr_tags: lead.append(o)
+            else:
+                first = o
+                break
+        cts,kw = _part_resp(req, tuple(lead))
+        self.headers.update(kw['headers'])
+        self.background = kw.get('background')
+        heads,bdy = partition(tuplify(cts), lambda o: getattr(o, 'tag', '') in self.hdr_tags)
+        self.bdy = [*bdy, first] if first is not None else bdy
+        self.shell = ['','']
+        # `Html` is a tuple of the doctype and the `html` element
+        if not is_full_page(req, [*heads, *(first if isinstance(first, tuple) else [first])]):
+            title = [] if any(getattr(o, 'tag', '')=='title' for o in heads) else [Title(req.app.title)]
+            marker = '<!--fh-stream-->'
+            page = _to_xml(req, respond(req, [*heads, *title, *_canonical(req)], Safe(marker)), indent=fh_cfg.indent)
+            self.shell = page.split(marker, 1)
+        else: self.bdy = [*heads, *self.bdy]
+
+    async def _body(self):
+        yield self.shell[0]
+        for o in self.bdy: yield _to_xml(self.req, await _resolve_aws(o), indent=fh_cfg.indent)
+        async for o in self.gen: yield _to_xml(self.req, await _resolve_aws(o), indent=fh_cfg.indent)
+        yield self.shell[1]
+
+    async def __call__(self, scope, receive, send):
+        await self._start()
+        await super().__call__(scope, receive, send)
+
+# %% ../nbs/api/00_core.ipynb #ba4f31f6
+class Deferred:
+    "Show `placeholder` in place of awaitable `coro`, whose result is streamed later in the same response"
+    def __init__(self, coro, placeholder=None, id=None): self.coro,self.placeholder,self.id = coro,placeholder,id or unqid()
+    def __ft__(self): return Div(self.placeholder, id=self.id)
+    async def resolve(self): return self, await _resolve_aws(self.coro)
+
+    def swap(self, res):
+        "Chunk replacing the placeholder with `res`: a template moved into place by a script"
+        id = json.dumps(self.id)
+        js = f"""{{ const t=document.currentScript.previousElementSibling, e=document.getElementById({id});
+    if (e) {{ e.replaceWith(t.content); if (window.htmx) htmx.process(document.getElementById({id})) }}
+    t.remove() }}"""
+        return Template(Div(res, id=self.id)), Script(Safe(js))
+
+def _deferreds(o, res):
+    "Append each `Deferred` in FT tree `o` to `res`"
+    if isinstance(o, Deferred): res.append(o)
+    elif isinstance(o, (FT,list,tuple)):
+        for c in o: _deferreds(c, res)
+    return res
+
+async def _resolve_defs(o):
+    "Replace each `Deferred` in FT tree `o` with its result, for responses that aren't streamed"
+    while (defs := _deferreds(o, [])):
+        res = await asyncio.gather(*[d.resolve() for d in defs])
+        o = _sub_aws(o, {id(d):Div(r, id=d.id) for d,r in res})
+    return o
+
+async def _defer_stream(resp, defs):
+    "Yield the parts of `resp`, then a swap of each of `defs` (and any `Deferred` in their results) as it resolves"
+    pending = {asyncio.ensure_future(d.resolve()) for d in defs}
+    try:
+        for o in flat_tuple(resp): yield o
+        while pending:
+            done,pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                d,res = t.result()
+                pending |= {asyncio.ensure_future(o.resolve()) for o in _deferreds(res, [])}
+                yield d.swap(res)
+    finally:
+        for t in pending: t.cancel()
+
 # %% ../nbs/api/00_core.ipynb #968d9245
 def _resp(req, resp, cls=empty, status_code=200):
     "Create appropriate HTTP response from request and response data"
     if resp is None: resp=''
+    if isinstance(resp, types.AsyncGeneratorType): return _FTStream(req, resp, status_code)
     if hasattr(resp, '__response__'): resp = resp.__response__(req)
     if not (isinstance(cls, type) and issubclass(cls, Response)): cls=empty
     if isinstance(resp, FileResponse) and not os.path.exists(resp.path): raise HTTPException(404, resp.path)
@@ -490,7 +1146,94 @@ class Redirect:
 async def _wrap_call(f, req, params):
     "Wrap function call with request parameter injection"
     wreq = await _wrap_req(req, params)
-    return await _handle(f, **wreq)
+    tok = next((o for o in wreq.values() if isinstance(o, CancelToken)), None)
+    watch = tok and asyncio.ensure_future(tok.watch(req))
+    if tok: req.cancel_token = tok
+    try:
+        bh = getattr(req, 'bulkhead', None)
+        if bh and not is_async_callable(f): return await bh.run(f, **wreq)
+        return await _handle(f, **wreq)
+    finally:
+        if watch: watch.cancel()
+
+# %% ../nbs/api/00_core.ipynb #dee006f0
+async def _call_timeout(req, coro, timeout=None, fallback=None):
+    "Await `coro`, returning `fallback` (or raising a 504) if it takes longer than `timeout` seconds"
+    if not timeout: return await coro
+    try: return await asyncio.wait_for(coro, timeout)
+    except asyncio.TimeoutError:
+        if fallback is None: raise HTTPException(504, 'Request timed out') from None
+        if callable(fallback) and not isinstance(fallback, FT): return await _wrap_call(fallback, req, _params(fallback))
+        return deepcopy(fallback)
+
+# %% ../nbs/api/00_core.ipynb #9dc1025e
+def unqid(seeded=False):
+    id4 = UUID(int=random.getrandbits(128), version=4) if seeded else uuid4()
+    res = b64encode(id4.bytes)
+    return '_' + res.decode().rstrip('=').translate(str.maketrans('+/', '_-'))
+
+def _sess_id(conn):
+    "Id of the session of request or websocket `conn`, created if needed, or `None` without sessions"
+    sess = conn.scope.get('session')
+    return sess.setdefault('fh_sid', unqid()) if sess is not None else None
+
+# %% ../nbs/api/00_core.ipynb #d0c2b12d
+def _supersede_key(req):
+    "Key identifying the session and htmx trigger element of `req`, or `None` if it wasn't triggered by an element"
+    htmx = _get_htmx(req.headers)
+    trigger = htmx.trigger or htmx.trigger_name
+    if not (htmx.request and trigger): return None
+    sid = _sess_id(req) or (req.client and req.client.host)
+    return f'{sid}|{trigger}'
+
+async def _call_latest(latest, key, req, coro):
+    "Await `coro`, first cancelling any earlier call with the same `key`; superseded calls return a 204"
+    if (prev := latest.get(key)):
+        prev.superseded = True
+        prev.cancel()
+        if (tok := getattr(prev.req, 'cancel_token', None)): tok.cancel('superseded')
+    work = latest[key] = asyncio.ensure_future(coro)
+    work.req = req
+    try: return await work
+    except (asyncio.CancelledError, HTTPException):
+        if getattr(work, 'superseded', False): return Response(status_code=204)
+        raise
+    finally:
+        if latest.get(key) is work: del latest[key]
+
+# %% ../nbs/api/00_core.ipynb #02ef3716
+async def _idem_key(req):
+    "The `Idempotency-Key` header of `req`, or its `idempotency_key` form field"
+    if (key := req.headers.get('idempotency-key')): return key
+    if req.method in ('GET','HEAD'): return None
+    return (await parse_form(req)).get('idempotency_key')
+
+def _replay(saved):
+    status,hdrs,body = saved
+    resp = Response(body, status_code=status)
+    resp.raw_headers = hdrs + [(b'idempotent-replayed', b'true')]
+    return resp
+
+def _idempotent(endp, maxsize=1000, maxpart=DEF_MAXPART):
+    "Wrap `endp` so requests repeating an idempotency key in the same session get the first response replayed, even while it's still running"
+    seen = collections.OrderedDict()
+    async def _f(req):
+        req.max_part_size = maxpart
+        if not (key := await _idem_key(req)): return await endp(req)
+        key = (req.url.path, _sess_id(req), req.scope.get('auth'), key)
+        while (fut := seen.get(key)) is not None:
+            if (saved := await asyncio.shield(fut)) is not None: return _replay(saved)
+        fut = seen[key] = asyncio.get_running_loop().create_future()
+        while len(seen) > maxsize: seen.popitem(last=False)
+        saved = None
+        try:
+            resp = await endp(req)
+            if hasattr(resp, 'body'): saved = (resp.status_code, [o for o in resp.raw_headers if o[0]!=b'set-cookie'], resp.body)
+            return resp
+        finally:
+            if saved is None and seen.get(key) is fut: del seen[key]
+            fut.set_result(saved)
+    return _f
 
 # %% ../nbs/api/00_core.ipynb #b0d1cbbf
 htmx_exts = {
@@ -608,7 +1351,8 @@ class FastHTML(Starlette):
                  before=None, after=None, surreal=True, htmx=True, default_hdrs=True, sess_cls=SessionMiddleware,
                  secret_key=None, session_cookie='session_', max_age=365*24*3600, sess_path='/',
                  same_site='lax', sess_https_only=False, sess_domain=None, key_fname='.sesskey',
-                 body_wrap=noop_body, htmlkw=None, nb_hdrs=False, canonical=True, max_part_size=DEF_MAXPART, **bodykw):
+                 body_wrap=noop_body, htmlkw=None, nb_hdrs=False, canonical=True, max_part_size=DEF_MAXPART, executors=None,
+                 max_body_size=None, **bodykw):
         middleware,before,after = map(_list, (middleware,before,after))
         self.title,self.canonical,self.session_cookie,self.key_fname = title,canonical,session_cookie,key_fname
         hdrs,ftrs,exts = map(listify, (hdrs,ftrs,exts))
@@ -624,6 +1368,7 @@ class FastHTML(Starlette):
         self.lifespan = Lifespan(on_startup, on_shutdown, lifespan)
         self.hdrs,self.ftrs = hdrs,ftrs
         self.body_wrap,self.before,self.after,self.htmlkw,self.bodykw,self.max_part_size = body_wrap,before,after,htmlkw,bodykw,max_part_size
+        self.executors,self.providers,self.body_limit,self.lazy_fns = executors or {},{},max_body_size,{}
         self.secret_key = get_key(secret_key, key_fname)
         if sess_cls:
             sess = Middleware(sess_cls, secret_key=self.secret_key,session_cookie=session_cookie,
@@ -674,14 +1419,23 @@ all_meths = 'get post put delete patch head trace options'.split()
 
 # %% ../nbs/api/00_core.ipynb #26b147ba
 @patch
-def _endp(self:FastHTML, f, body_wrap, before:Optional[Callable|tuple]=None):
+def _endp(self:FastHTML, f, body_wrap, before:Optional[Callable|tuple]=None, executor:str|Bulkhead|None=None, timeout=None, fallback=None,
+          supersede=False, idempotent:bool|int=False, max_body_size:int|None=None, select_target=False):
     "Create endpoint wrapper with before/after middleware processing"
     sig = signature_ex(f, True)
-    for n,p in sig.parameters.items(): (msg:=_check_anno(n,p.annotation)) and warn(msg)
+    if executor=='process' and 'process' not in self.executors: self.executors['process'] = ProcessPool()
+    bh = self.executors.get(executor or 'default') if not isinstance(executor, Bulkhead) else executor
+    if executor and not bh: raise KeyError(f"No executor named {executor!r}")
+    for n,p in sig.parameters.items():
+        (msg:=_check_anno(n,p.annotation)) and warn(msg)
+        if p.annotation is not empty: _conv(p.annotation)
+    latest,gen_f = {},inspect.isgeneratorfunction(f)
+    stream_body = any(isinstance(p.annotation, type) and issubclass(p.annotation, UploadStream) for p in sig.parameters.values())
     async def _f(req):
+        _cur_req.set(req)
         resp = None
         req.injects = []
-        req.max_part_size = self.max_part_size
+        req.max_part_size,req.stream_body,req.select_target = self.max_part_size,stream_body,select_target
         req.hdrs,req.ftrs,req.htmlkw,req.bodykw = map(deepcopy, (self.hdrs,self.ftrs,self.htmlkw,self.bodykw))
         req.hdrs,req.ftrs = listify(req.hdrs),listify(req.ftrs)
         for b in self.before:
@@ -692,21 +1446,40 @@ def _endp(self:FastHTML, f, body_wrap, before:Optional[Callable|tuple]=None):
                     resp = await _wrap_call(bf, req, _params(bf))
         for b in listify(before):
             if not resp: resp = await _wrap_call(b, req, _params(b))
-        req.body_wrap = body_wrap
-        if not resp: resp = await _wrap_call(f, req, sig.parameters)
+        req.body_wrap,req.bulkhead = body_wrap,bh
+        # Idempotent replay wraps `_call`, so it only happens once beforeware has run (and set `auth`)
+        return await (_finish(req, resp) if resp else _call(req))
+
+    async def _call(req):
+        if timeout: req.deadline = time.monotonic()+timeout
+        work = _call_timeout(req, _wrap_call(f, req, sig.parameters), timeout, fallback)
+        key = supersede and _supersede_key(req)
+        resp = await (_call_latest(latest, key, req, work) if key else work)
+        if gen_f and isinstance(resp, types.GeneratorType): resp = iterate_in_threadpool(resp)
+        return await _finish(req, resp)
+
+    async def _finish(req, resp):
+        resp = await _resolve_aws(resp)
+        if (defs := _deferreds(resp, [])):
+            # htmx only swaps once the whole response has arrived, so its sections are filled in before sending
+            resp = await _resolve_defs(resp) if 'hx-request' in req.headers else _defer_stream(resp, defs)
         for a in self.after:
             wreq = await _wrap_req(req, _params(a))
             wreq['resp'] = resp
             nr = a(**wreq)
             if nr: resp = nr
         return _resp(req, resp, sig.return_annotation)
-    return _f
+    if idempotent: _call = _idempotent(_call, 1000 if idempotent is True else idempotent, self.max_part_size)
+    async def _limited(req):
+        _limit_body(req, max_body_size or self.body_limit)
+        return await _f(req)
+    return _limited
 
 # %% ../nbs/api/00_core.ipynb #3818575c
 @patch
-def _add_ws(self:FastHTML, func, path, conn, disconn, name, middleware):
+def _add_ws(self:FastHTML, func, path, conn, disconn, name, middleware, binary=False, indent=None, resume=None, idle=None):
     "Add websocket route to FastHTML app"
-    endp = _ws_endp(func, conn, disconn)
+    endp = _ws_endp(func, conn, disconn, binary=binary, indent=indent, resume=resume, idle=idle)
     route = WebSocketRoute(path, endpoint=endp, name=name, middleware=middleware)
     route.methods = ['ws']
     self.add_route(route)
@@ -714,16 +1487,16 @@ def _add_ws(self:FastHTML, func, path, conn, disconn, name, middleware):
 
 # %% ../nbs/api/00_core.ipynb #669e76eb
 @patch
-def ws(self:FastHTML, path:str, conn=None, disconn=None, name=None, middleware=None):
+def ws(self:FastHTML, path:str, conn=None, disconn=None, name=None, middleware=None, binary=False, indent=None, resume=None, idle=None):
     "Add a websocket route at `path`"
-    def f(func=noop): return self._add_ws(func, path, conn, disconn, name=name, middleware=middleware)
+    def f(func=noop): return self._add_ws(func, path, conn, disconn, name=name, middleware=middleware, binary=binary, indent=indent, resume=resume, idle=idle)
     return f
 
 # %% ../nbs/api/00_core.ipynb #j6ete5u68fo
 @patch
-def add_websocket_route(self:FastHTML, path, func, conn=None, disconn=None, name=None, middleware=None):
+def add_websocket_route(self:FastHTML, path, func, conn=None, disconn=None, name=None, middleware=None, binary=False, indent=None, resume=None, idle=None):
     "Add a websocket route at `path` (Starlette-compatible API)"
-    return self._add_ws(func, path, conn, disconn, name=name, middleware=middleware)
+    return self._add_ws(func, path, conn, disconn, name=name, middleware=middleware, binary=binary, indent=indent, resume=resume, idle=idle)
 
 # %% ../nbs/api/00_core.ipynb #919618c3
 def _mk_locfunc(f, p, app=None):
@@ -746,14 +1519,14 @@ def nested_name(f):
 
 # %% ../nbs/api/00_core.ipynb #daafe4fc
 @patch
-def _add_routes(self:FastHTML, cls, path, methods, name, include_in_schema, body_wrap, host=None, before:Optional[Callable|tuple]=None):
+def _add_routes(self:FastHTML, cls, path, methods, name, include_in_schema, body_wrap, host=None, before:Optional[Callable|tuple]=None, **kw):
     "Add HTTP routes from methods on endpoint class `cls`"
     assert not methods, '`methods` is not supported for class route groups; define HTTP methods as class methods instead'
     lf = _mk_locfunc(cls, path, app=self)
     lf.__routename__ = name
     for meth in all_meths:
         handler = getattr(cls, meth, None)
-        if handler: self._add_route(handler, path, meth, name, include_in_schema, body_wrap, host=host, before=before)
+        if handler: self._add_route(handler, path, meth, name, include_in_schema, body_wrap, host=host, before=before, **kw)
     return lf
 
 # %% ../nbs/api/00_core.ipynb #3710e48b
@@ -767,14 +1540,18 @@ def _route_pn(func, path, name):
     return name,fn,p
 
 @patch
-def _add_route(self:FastHTML, func, path, methods, name, include_in_schema, body_wrap, host=None, before:Optional[Callable|tuple]=None):
+def _add_route(self:FastHTML, func, path, methods, name, include_in_schema, body_wrap, host=None, before:Optional[Callable|tuple]=None,
+               executor=None, timeout=None, fallback=None, supersede=False, idempotent=False, max_body_size=None, select_target=False):
     "Add HTTP route to FastHTML app with automatic method detection"
     n,fn,p = _route_pn(func, path, name)
-    if isinstance(func, type): return self._add_routes(func, p, methods, n, include_in_schema, body_wrap, host=host, before=before)
+    if isinstance(func, type): return self._add_routes(func, p, methods, n, include_in_schema, body_wrap, host=host, before=before, executor=executor,
+                                                       timeout=timeout, fallback=fallback, supersede=supersede, idempotent=idempotent,
+                                                       max_body_size=max_body_size, select_target=select_target)
     if methods: m = [methods] if isinstance(methods,str) else methods
     elif fn in all_meths and p is not None: m = [fn]
     else: m = ['get','post']
-    endp = self._endp(func, body_wrap or self.body_wrap, before=before)
+    endp = self._endp(func, body_wrap or self.body_wrap, before=before, executor=executor, timeout=timeout, fallback=fallback,
+                      supersede=supersede, idempotent=idempotent, max_body_size=max_body_size, select_target=select_target)
     route = HostRoute(p, endpoint=endp, methods=m, name=n, include_in_schema=include_in_schema, host=host)
     self.add_route(route)
     lf = _mk_locfunc(func, p, app=self)
@@ -783,14 +1560,62 @@ def _add_route(self:FastHTML, func, path, methods, name, include_in_schema, body
 
 # %% ../nbs/api/00_core.ipynb #f5cb2c2b
 @patch
-def route(self:FastHTML, path:str=None, methods=None, name=None, include_in_schema=True, body_wrap=None, host=None, before:Optional[Callable|tuple]=None):
+def route(self:FastHTML, path:str=None, methods=None, name=None, include_in_schema=True, body_wrap=None, host=None, before:Optional[Callable|tuple]=None,
+          executor=None, timeout=None, fallback=None, supersede=False, idempotent=False, max_body_size=None, select_target=False):
     "Add a route at `path`"
     def f(func):
-        return self._add_route(func, path, methods, name=name, include_in_schema=include_in_schema, body_wrap=body_wrap, host=host, before=before)
+        return self._add_route(func, path, methods, name=name, include_in_schema=include_in_schema, body_wrap=body_wrap, host=host, before=before,
+                               executor=executor, timeout=timeout, fallback=fallback, supersede=supersede, idempotent=idempotent,
+                               max_body_size=max_body_size, select_target=select_target)
     return f(path) if callable(path) else f
 
 for o in all_meths: setattr(FastHTML, o, partialmethod(FastHTML.route, methods=o))
 
+# %% ../nbs/api/00_core.ipynb #054b3429
+@patch
+def provide(self:FastHTML, typ, f=None, scope='request'):
+    "Inject the result of `f` into params annotated with `typ`, memoized per request (`scope='request'`) or app-wide (`scope='app'`)"
+    def _f(f):
+        self.providers[typ] = _Provider(f, scope)
+        return f
+    return _f(f) if f else _f
+
+# %% ../nbs/api/00_core.ipynb #6029407f
+_cur_req = contextvars.ContextVar('fh_req', default=None)
+
+@patch
+def lazy(self:FastHTML, fn=None, path=None):
+    "Register component `fn` to be loaded by `Lazy`, from a signed fragment endpoint at `path`"
+    def _f(fn):
+        p = path or f'/_fh/lazy/{nested_name(fn)}'
+        signer = itsdangerous.Signer(self.secret_key, salt='fh-lazy')
+        def _verify(req):
+            q,_,sig = req.url.query.rpartition('sig=')
+            if not signer.verify_signature(f'{p}?{q.rstrip("&")}'.encode(), sig.encode()): raise HTTPException(403, "Invalid signature")
+        self._add_route(fn, p, 'get', f'lazy_{nested_name(fn)}', False, None, before=_verify)
+        self.lazy_fns[fn] = p
+        return fn
+    return _f(fn) if fn else _f
+
+@patch
+def _lazy_url(self:FastHTML, fn, kw):
+    "Signed URL of the fragment endpoint of `fn`, called with params `kw`"
+    if not (path := self.lazy_fns.get(fn)): raise ValueError(f"Register `{nested_name(fn)}` with `@app.lazy` to use it with `Lazy`")
+    q = urlencode({k:v for k,v in kw.items() if v is not None}, doseq=True)
+    sig = itsdangerous.Signer(self.secret_key, salt='fh-lazy').get_signature(f'{path}?{q}'.encode()).decode()
+    return f'{path}?{q}&sig={sig}' if q else f'{path}?sig={sig}'
+
+class Lazy:
+    "Placeholder loading `fn(*args, **kwargs)` from a signed fragment endpoint when `trigger` fires"
+    def __init__(self, fn, *args, trigger='revealed', placeholder=None, **kwargs):
+        self.fn,self.trigger,self.placeholder = fn,trigger,placeholder
+        self.kw = inspect.signature(fn).bind_partial(*args, **kwargs).arguments
+
+    def __ft__(self):
+        if (req := _cur_req.get()) is None: raise RuntimeError("`Lazy` can only be rendered while handling a request")
+        url = req.scope['app']._lazy_url(self.fn, self.kw)
+        return Div(self.placeholder, hx_get=url, hx_trigger=self.trigger, hx_swap='outerHTML')
+
 # %% ../nbs/api/00_core.ipynb #35c35a96
 @patch
 def set_lifespan(self:FastHTML, value):
@@ -863,6 +1688,60 @@ class Client:
 
 for o in ('get', 'post', 'delete', 'put', 'patch', 'options'): setattr(Client, o, partialmethod(Client._sync, o))
 
+# %% ../nbs/api/00_core.ipynb #eccdbb94
+class ResumableUpload:
+    "Endpoint receiving files in resumable chunks, saved to `dest`"
+    def __init__(self, dest, max_size=None, on_complete=None):
+        self.dest,self.max_size,self.on_complete = Path(dest),max_size,on_complete
+        self.dest.mkdir(parents=True, exist_ok=True)
+
+    def _part(self, req, uid):
+        if not re.fullmatch(r'[\w-]{1,64}', uid or ''): raise HTTPException(400, "Invalid upload id")
+        # Client-chosen ids are scoped to the session, so clients can't append to each other's uploads
+        return self.dest/f"{hashlib.sha256(f'{_sess_id(req)}|{uid}'.encode()).hexdigest()[:32]}.part"
+
+    def offset(self, req, uid):
+        "Number of bytes received so far for upload `uid` in the session of `req`"
+        part = self._part(req, uid)
+        return part.stat().st_size if part.exists() else 0
+
+    def _save(self, part, name):
+        "Move complete upload `part` to `name` in `dest`, numbering it rather than overwriting an existing file"
+        stem,sfx,i = Path(name).stem,Path(name).suffix,0
+        while True:
+            dest = self.dest/(f'{stem}-{i}{sfx}' if i else name)
+            try: os.link(part, dest)
+            except FileExistsError: i += 1; continue
+            part.unlink()
+            return dest
+
+    async def handle(self, req):
+        uid = req.query_params.get('uid')
+        off = self.offset(req, uid)
+        if req.method=='GET': return Response(status_code=204, headers={'Upload-Offset': str(off)})
+        try: start,length = int(req.headers['upload-offset']),int(req.headers['upload-length'])
+        except (KeyError, ValueError): raise HTTPException(400, "Upload-Offset and Upload-Length headers are required") from None
+        if self.max_size and length > self.max_size: raise HTTPException(413, f"Upload exceeds {self.max_size} bytes")
+        if start!=off: return Response(status_code=409, headers={'Upload-Offset': str(off)})
+        part = self._part(req, uid)
+        f = await to_thread.run_sync(part.open, 'ab')
+        try:
+            async for chunk in req.stream():
+                if off+len(chunk) > length: raise HTTPException(413, "Upload exceeds its Upload-Length")
+                await to_thread.run_sync(f.write, chunk)
+                off += len(chunk)
+        finally: await to_thread.run_sync(f.close)
+        if off==length:
+            name = Path(unquote(req.headers.get('upload-name', ''))).name or uid
+            dest = await to_thread.run_sync(self._save, part, name)
+            if self.on_complete: await maybe_await(self.on_complete(dest))
+        return Response(status_code=204, headers={'Upload-Offset': str(off)})
+
+    def mount(self, app, path='/upload'):
+        "Add this endpoint to `app` at `path`, behind the app's beforeware"
+        app.route(path, methods=['GET','PATCH'])(self.handle)
+        return self
+
 # %% ../nbs/api/00_core.ipynb #d5223a9a
 class RouteFuncs:
     def __init__(self): super().__setattr__('_funcs', {})
@@ -889,13 +1768,13 @@ class APIRouter:
         if name not in all_meths: setattr(self.rt_funcs, name, wrapped)
         return wrapped
 
-    def __call__(self, path:str=None, methods=None, name=None, include_in_schema=True, body_wrap=None):
-        "Add a route at `path`"
+    def __call__(self, path:str=None, methods=None, name=None, include_in_schema=True, body_wrap=None, **kw):
+        "Add a route at `path`, passing route options in `kw` through to `FastHTML.route`"
         def f(func):
             n,_,p = _route_pn(func, path, name)
             p = self.prefix + p
             wrapped = self._wrap_func(func, p, n)
-            self.routes.append((func, p, methods, n, include_in_schema, body_wrap or self.body_wrap))
+            self.routes.append((func, p, methods, n, include_in_schema, body_wrap or self.body_wrap, kw))
             return wrapped
         return f(path) if callable(path) else f
 
@@ -905,12 +1784,12 @@ class APIRouter:
 
     def to_app(self, app):
         "Add routes to `app`"
-        for args in self.routes: app._add_route(*args)
+        for *args,kw in self.routes: app._add_route(*args, **kw)
         for args in self.wss: app._add_ws(*args)
 
-    def ws(self, path:str, conn=None, disconn=None, name=None, middleware=None):
+    def ws(self, path:str, conn=None, disconn=None, name=None, middleware=None, binary=False, indent=None, resume=None, idle=None):
         "Add a websocket route at `path`"
-        def f(func=noop): return self.wss.append((func, f"{self.prefix}{path}", conn, disconn, name, middleware))
+        def f(func=noop): return self.wss.append((func, f"{self.prefix}{path}", conn, disconn, name, middleware, binary, indent, resume, idle))
         return f
 
 # %% ../nbs/api/00_core.ipynb #259a0f53
@@ -1045,12 +1924,6 @@ class FtResponse:
         headers = {**(self.headers or {}), **httphdrs}
         return self.cls(cts, status_code=self.status_code, headers=headers, media_type=self.media_type, background=tasks)
 
-# %% ../nbs/api/00_core.ipynb #9dc1025e
-def unqid(seeded=False):
-    id4 = UUID(int=random.getrandbits(128), version=4) if seeded else uuid4()
-    res = b64encode(id4.bytes)
-    return '_' + res.decode().rstrip('=').translate(str.maketrans('+/', '_-'))
-
 # %% ../nbs/api/00_core.ipynb #5b67e014
 def _add_ids(s):
     if not isinstance(s, FT): return
@@ -1069,6 +1942,18 @@ def setup_ws(app:FastHTML, f=noop):
     app._send = send
     return send
 
+# %% ../nbs/api/00_core.ipynb #4a255a2a
+def ws_token(req):
+    "New websocket resume token, signed and bound to the session of `req`"
+    signer = itsdangerous.Signer(req.scope['app'].secret_key, salt='fh-ws')
+    return signer.sign(f'{_sess_id(req)}.{unqid()}').decode()
+
+def _ws_tok_ok(ws, tok):
+    "Whether `tok` was issued by `ws_token` for the session of `ws`"
+    try: payload = itsdangerous.Signer(ws.scope['app'].secret_key, salt='fh-ws').unsign(tok).decode()
+    except (itsdangerous.BadSignature, AttributeError): return False
+    return payload.partition('.')[0]==str(_sess_id(ws))
+
 # %% ../nbs/api/00_core.ipynb #a8a91edd
 devtools_loc = "/.well-known/appspecific/com.chrome.devtools.json"
 
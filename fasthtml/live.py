@@ -0,0 +1,163 @@
+import asyncio, inspect, time
+from collections import OrderedDict
+from fastcore.xml import FT, to_xml
+from fasthtml.core import *
+from fasthtml.core import _fix_anno, _cur_req, _ws_tok_ok
+from fastcore.utils import maybe_await
+from fasthtml.components import Button, Div
+
+def _id(o): return o.attrs.get('id') if isinstance(o, FT) else None
+
+def _oob(o, swap='true'):
+    "Copy of element `o` marked to be swapped out of band"
+    return FT(o.tag, o.children, {**o.attrs, 'hx-swap-oob': swap}, void_=o.void_)
+
+class _Keys:
+    "Structural hashes of FT nodes, so equal subtrees are found without rendering them"
+    def __init__(self): self.memo = {}
+    def __call__(self, o):
+        if id(o) in self.memo: return self.memo[id(o)][1]
+        if isinstance(o, FT): k = hash((o.tag, str(o.attrs), tuple(self(c) for c in o.children)))
+        elif hasattr(o, '__ft__'): k = hash(to_xml(o))
+        # `to_xml` only accepts FT, so other children (numbers, `None`, ...) are keyed by type and text like it renders them
+        else: k = hash((type(o), str(o)))
+        self.memo[id(o)] = (o, k)  # Keep `o` alive, so its `id` isn't reused
+        return k
+
+def _keyed_diff(o, n, key):
+    "Swaps for the `id`-keyed children of `o` changing to those of `n`, or `None` if they were reordered or inserted"
+    oids,nids = [_id(c) for c in o.children],[_id(c) for c in n.children]
+    if len(set(nids)) < len(nids): return None
+    oset,nset = set(oids),set(nids)
+    kept = [i for i in nids if i in oset]
+    if kept != [i for i in oids if i in nset] or nids[:len(kept)] != kept: return None
+    old = dict(zip(oids, o.children))
+    res = [FT(c.tag, (), {'id': i, 'hx-swap-oob': 'delete'}) for i,c in zip(oids, o.children) if i not in nset]
+    for i,c in zip(nids[:len(kept)], n.children): res += _diff(old[i], c, key)
+    if (added := n.children[len(kept):]): res.append(FT(n.tag, added, {'hx-swap-oob': f'beforeend:#{_id(n)}'}))
+    return res
+
+def _diff(o, n, key):
+    "OOB swaps turning `o` into `n`, replacing `n` whole if it has an `id` and can't be updated in part, or else `None`"
+    if key(o)==key(n): return []
+    res = None
+    if isinstance(o, FT) and isinstance(n, FT) and o.tag==n.tag and o.attrs==n.attrs:
+        oc,nc = o.children,n.children
+        if oc and nc and all(map(_id, oc)) and all(map(_id, nc)) and _id(n): res = _keyed_diff(o, n, key)
+        elif len(oc)==len(nc):
+            rs = [_diff(a, b, key) for a,b in zip(oc, nc)]
+            if None not in rs: res = sum(rs, [])
+    if res is None and _id(n): res = [_oob(n)]
+    return res
+
+class Swaps(tuple):
+    "OOB swap fragments from `diff_swap`, with the bytes sent compared to re-sending `new` whole"
+    def __new__(cls, swaps, new): return super().__new__(cls, swaps)
+    def __init__(self, swaps, new): self.new = new
+    @property
+    def sent(self): return len(to_xml(tuple(self)).encode())
+    @property
+    def full(self): return len(to_xml(_oob(self.new)).encode())
+    @property
+    def saved(self): return self.full - self.sent
+    def __repr__(self): return f'Swaps({len(self)} swaps, {self.sent} of {self.full} bytes)'
+
+def diff_swap(old:FT, new:FT)->Swaps:
+    "Minimal `hx-swap-oob` fragments (replace, append and delete) updating region `old` to `new`, matching elements by `id`"
+    if not _id(new): raise ValueError("`diff_swap` needs a region with an `id`")
+    if old is None or _id(old)!=_id(new): return Swaps([_oob(new)], new)
+    return Swaps(_diff(old, new, _Keys()), new)
+
+class LiveComponent:
+    "Component whose state is held on the server, handling events over a websocket and sending only the parts that changed"
+    maxsize,idle,path,store = 1000,600,None,None
+    _tok = _ws = _send = _last = None
+
+    def __init__(self, **state): self.__dict__.update(state)
+    def __init_subclass__(cls, **kw):
+        super().__init_subclass__(**kw)
+        if not callable(getattr(cls, 'render', None)): raise TypeError(f"`{cls.__name__}` must define `render`, returning an FT with an `id`")
+
+    def action(self, event, *c, tag=Button, **kw):
+        "A `tag` element which sends `event` (handled by method `on_{event}`) over the websocket"
+        return tag(*c, ws_send=True, hx_vals={'event': event}, **kw)
+
+    def update(self)->Swaps:
+        "Re-render, returning the swaps for whatever changed since the last render"
+        new = self.render()
+        swaps,self._last = diff_swap(self._last, new),new
+        return swaps
+
+    async def push(self):
+        "Send any changes to the client, for state updated outside an event handler"
+        if self._send:
+            self._touch()
+            await self._send(self.update())
+
+    def _touch(self):
+        "Mark this instance as in use, so it isn't evicted"
+        self._seen = time.monotonic()
+        if self.store is not None and self._tok in self.store: self.store.move_to_end(self._tok)
+
+    @classmethod
+    def mount(cls, app, path=None, maxsize=None, idle=None):
+        "Add a websocket route at `path` for instances of `cls`, keeping at most `maxsize`, each for up to `idle` seconds unused"
+        cls.path,cls.store = path or f'/live/{cls.__name__.lower()}',OrderedDict()
+        if maxsize is not None: cls.maxsize = maxsize
+        if idle is not None: cls.idle = idle
+        app.ws(cls.path, conn=cls._connect, disconn=cls._disconnect, idle=cls.idle)(cls._event)
+        return cls
+
+    @classmethod
+    def live(cls, *args, **kwargs):
+        "Render a new instance `cls(*args, **kwargs)`, wrapped in an element connecting it to its websocket"
+        if cls.store is None: raise RuntimeError(f"`{cls.__name__}.mount(app)` must be called before rendering it")
+        if (req := _cur_req.get()) is None: raise RuntimeError(f"`{cls.__name__}.live` can only be rendered while handling a request")
+        self = cls(*args, **kwargs)
+        self._tok,self._seen = ws_token(req),time.monotonic()
+        cls.store[self._tok] = self
+        cls._evict()
+        self.update()
+        return Div(self._last, hx_ext='ws', ws_connect=f'{cls.path}?tok={self._tok}')
+
+    @classmethod
+    def _evict(cls):
+        "Drop the least recently used instances beyond `maxsize`, and any unused for more than `idle` seconds"
+        now = time.monotonic()
+        while cls.store and (len(cls.store) > cls.maxsize or now - next(iter(cls.store.values()))._seen > cls.idle):
+            _,o = cls.store.popitem(last=False)
+            if o._ws is not None: asyncio.ensure_future(o._ws.close())
+
+    @classmethod
+    def _get(cls, tok):
+        if (self := cls.store.get(tok)) is not None: self._touch()
+        cls._evict()
+        return self
+
+    @classmethod
+    async def _connect(cls, ws, send):
+        tok = ws.query_params.get('tok')
+        # Tokens are signed and bound to the session they were rendered for, and an instance takes one connection at a time
+        if not (tok and _ws_tok_ok(ws, tok)) or getattr(cls.store.get(tok), '_ws', None) is not None: return await ws.close(1008)
+        if (self := cls._get(tok)) is None:
+            # Evicted instances restart from a default state, replacing what the client shows
+            self = cls()
+            self._tok,self._seen = tok,time.monotonic()
+            cls.store[self._tok] = self
+            cls._evict()
+        self._ws,self._send = ws,send
+        return self.update()
+
+    @classmethod
+    async def _disconnect(cls, ws):
+        if (self := cls.store.get(ws.query_params.get('tok'))) is not None and self._ws is ws: self._ws = self._send = None
+
+    @classmethod
+    async def _event(cls, ws, data:dict):
+        if (self := cls._get(ws.query_params.get('tok'))) is None or self._ws is not ws: return
+        f = getattr(self, f"on_{data.get('event')}", None)
+        if f is None: raise ValueError(f"Unknown event: {data.get('event')}")
+        ps = inspect.signature(f).parameters
+        kw = {k:data[k] if p.annotation is p.empty else _fix_anno(p.annotation, data[k]) for k,p in ps.items() if k in data}
+        await maybe_await(f(**kw))
+        return self.update()
@@ -0,0 +1,76 @@
+import json, math, sqlite3, threading, time
+from collections import OrderedDict
+from fasthtml.core import *
+from fasthtml.starlette import *
+
+def client_ip(req, proxy_hops=0):
+    "Client address, taken `proxy_hops` entries from the right of `X-Forwarded-For` when behind that many trusted proxies"
+    fwd = [o.strip() for o in req.headers.get('x-forwarded-for', '').split(',') if o.strip()]
+    if proxy_hops and fwd: return fwd[-min(proxy_hops, len(fwd))]
+    return req.client.host if req.client else ''
+
+def _refill(tokens, ts, now, rate, burst): return min(burst, tokens + (now-ts)*rate)
+
+class MemoryStore:
+    "In-process token buckets, keeping at most `maxsize` keys"
+    def __init__(self, maxsize=100_000): self.buckets,self.maxsize,self.lock = OrderedDict(),maxsize,threading.Lock()
+
+    def take(self, key, rate, burst):
+        now = time.time()
+        with self.lock:
+            tokens,ts = self.buckets.pop(key, (burst, now))
+            tokens = _refill(tokens, ts, now, rate, burst)
+            wait = 0 if tokens>=1 else (1-tokens)/rate
+            self.buckets[key] = (tokens-1 if tokens>=1 else tokens, now)
+            if len(self.buckets) > self.maxsize: self.buckets.popitem(last=False)
+        return wait
+
+class SqliteStore:
+    "Token buckets in a local SQLite file, shared by all worker processes on a host"
+    def __init__(self, path='.ratelimit.db', timeout=1, prune_every=60):
+        # `take` runs synchronously in beforeware, so a locked database blocks the worker for up to `timeout` seconds
+        self.path,self.timeout,self.prune_every,self.pruned = path,timeout,prune_every,0
+        self.local = threading.local()
+        with self._db() as db: db.execute('create table if not exists buckets (key text primary key, tokens real, ts real, full real)')
+
+    def _db(self):
+        if not hasattr(self.local, 'db'):
+            self.local.db = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            self.local.db.execute('pragma journal_mode=wal')
+        return self.local.db
+
+    def take(self, key, rate, burst):
+        db,now = self._db(),time.time()
+        db.execute('begin immediate')
+        try:
+            row = db.execute('select tokens, ts from buckets where key=?', (key,)).fetchone()
+            tokens = _refill(*(row or (burst, now)), now, rate, burst)
+            wait = 0 if tokens>=1 else (1-tokens)/rate
+            if tokens>=1: tokens -= 1
+            db.execute('insert or replace into buckets values (?,?,?,?)', (key, tokens, now, now + (burst-tokens)/rate))
+            # A bucket that has refilled is the same as no row, so those are dropped now and then
+            if now - self.pruned >= self.prune_every:
+                db.execute('delete from buckets where full < ?', (now,))
+                self.pruned = now
+        finally: db.execute('commit')
+        return wait
+
+class RateLimit:
+    "Beforeware allowing `rate` requests per `per` seconds per client, with bursts of up to `burst`"
+    def __init__(self, rate=10, per=60, burst=None, key='auth', store=None, proxy_hops=0, name='rl', msg='Too many requests'):
+        self.rate,self.burst,self.key,self.proxy_hops = rate/per,burst or rate,key,proxy_hops
+        self.name,self.msg = name,msg
+        self.store = store or MemoryStore()
+
+    def client_key(self, req):
+        if callable(self.key): return str(self.key(req))
+        if self.key=='auth' and req.scope.get('auth'): return f"auth:{req.scope['auth']}"
+        if self.key=='session' and 'session' in req.scope: return f"sess:{req.scope['session'].setdefault('rl_id', unqid())}"
+        return f"ip:{client_ip(req, self.proxy_hops)}"
+
+    def __call__(self, req):
+        wait = self.store.take(f'{self.name}|{self.client_key(req)}', self.rate, self.burst)
+        if not wait: return
+        hdrs = {'Retry-After': str(math.ceil(wait))}
+        if 'hx-request' in req.headers: hdrs |= {'HX-Reswap': 'none', 'HX-Trigger': json.dumps({'rateLimited': {'retryAfter': math.ceil(wait)}})}
+        return Response(self.msg, status_code=429, headers=hdrs)
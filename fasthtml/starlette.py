@@ -18,7 +18,7 @@ from starlette.endpoints import HTTPEndpoint,WebSocketEndpoint
 from starlette.config import Config
 from starlette.datastructures import CommaSeparatedStrings, Secret, UploadFile, URLPath, State
 from starlette.types import ASGIApp, Receive, Scope, Send
-from starlette.concurrency import run_in_threadpool
+from starlette.concurrency import run_in_threadpool, iterate_in_threadpool
 from starlette.background import BackgroundTask, BackgroundTasks
 from starlette.websockets import WebSocketDisconnect, WebSocket
 
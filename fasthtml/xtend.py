@@ -9,7 +9,7 @@ __all__ = ['sid_scr', 'A', 'AX', 'Form', 'Hidden', 'CheckboxX', 'Script', 'Style
            'loose_format', 'ScriptX', 'replace_css_vars', 'StyleX', 'Nbsp', 'Surreal', 'On', 'Prev', 'Now', 'AnyNow',
            'run_js', 'HtmxOn', 'jsd', 'Fragment', 'Titled', 'Socials', 'YouTubeEmbed', 'Favicon', 'clear', 'with_sid',
            'LdJson', 'LdContactPoint', 'LdOrg', 'LdWebsite', 'LdCourseInstance', 'LdCourse', 'robots_txt',
-           'sitemap_url', 'sitemap_xml', 'upload_pb_attrs']
+           'sitemap_url', 'sitemap_xml', 'upload_pb_attrs', 'chunked_upload_attrs']
 
 # %% ../nbs/api/02_xtend.ipynb #8e2d405b
 from dataclasses import dataclass, asdict
@@ -36,8 +36,9 @@ def AX(txt, hx_get=None, target_id=None, hx_swap=None, href='#', **kwargs)->FT:
 
 # %% ../nbs/api/02_xtend.ipynb #84ea5b04
 @delegates(ft_hx, keep=True)
-def Form(*c, enctype="multipart/form-data", **kwargs)->FT:
+def Form(*c, enctype="multipart/form-data", idempotent=False, **kwargs)->FT:
     "A Form tag; identical to plain `ft_hx` version except default `enctype='multipart/form-data'`"
+    if idempotent: c = (*c, Input(type='hidden', name='idempotency_key', value=unqid()))
     return ft_hx('form', *c, enctype=enctype, **kwargs)
 
 # %% ../nbs/api/02_xtend.ipynb #6aaebe19
@@ -356,3 +357,28 @@ def upload_pb_attrs(id='uploadprog'):
     js = """{ const p=document.getElementById('%s');
         if(event.detail.total) {p.classList.remove('hidden'); p.value=event.detail.loaded/event.detail.total*100} }""" % id
     return {'hx-on::xhr:progress': js}
+
+# %% ../nbs/api/02_xtend.ipynb #3341f2a1
+def chunked_upload_attrs(url='/upload', id='uploadprog', chunk_size=4*1024*1024, retries=5):
+    "File `Input` attrs sending chosen files in resumable chunks to a `ResumableUpload` at `url`, updating an `upload_pb` of matching `id`"
+    js = """(async (inp) => { const p=document.getElementById('%s');
+        for (const f of inp.files) {
+            const q='%s?uid='+[f.name,f.size,f.lastModified].join('-').replace(/[^\\w-]/g,'_').slice(-64);
+            let off=null, tries=0;
+            while (off===null || off<f.size) {
+                try {
+                    if (off===null) off = +(await fetch(q)).headers.get('Upload-Offset');
+                    if (off>=f.size) break;
+                    const r = await fetch(q, {method:'PATCH', body:f.slice(off, off+%d), headers:{'Upload-Offset':off,
+                        'Upload-Length':f.size, 'Upload-Name':encodeURIComponent(f.name)}});
+                    if (!r.ok && r.status!==409) throw new Error(r.statusText);
+                    off = +r.headers.get('Upload-Offset'); tries = 0;
+                } catch(e) {
+                    if (++tries>%d) throw e;
+                    off = null; await new Promise(r => setTimeout(r, 1000*tries));
+                }
+                if (p && f.size) {p.classList.remove('hidden'); p.value=off/f.size*100}
+            }
+            inp.dispatchEvent(new CustomEvent('fh:uploaded', {bubbles:true, detail:{name:f.name}}));
+        } })(this)""" % (id, url, chunk_size, retries)
+    return {'hx-on:change': js}
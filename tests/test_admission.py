@@ -0,0 +1,59 @@
+from fasthtml.common import *
+from starlette.testclient import TestClient
+
+ctl = AdmissionControl(max_inflight=10, max_lag=0.5, fallback=P('Busy, try again', id='busy'), interval=60, cache_size=256)
+app, rt = fast_app(middleware=[ctl.middleware])
+cli = TestClient(app)
+hx = {'HX-Request': '1'}
+
+@rt("/")
+def get(): return P('home')
+
+@rt("/health")
+def get(): return 'ok'
+
+@rt("/items")
+def get(q: str = ''): return Ul(Li(q), id='items'), HttpHeader('Cache-Control', 'public, max-age=5')
+
+@rt("/balance")
+def get(session): return P(f"Balance for {session.get('user', 'anon')}: 100", id='balance')
+
+def test_admits_under_limits():
+    assert cli.get('/').status_code == 200
+    assert ctl.inflight == 0
+    assert ctl.stats['admitted']['page'] >= 1
+
+def test_sheds_by_priority():
+    shed = ctl.shed.copy()
+    ctl.inflight = 8
+    try:
+        res = cli.get('/')
+        assert res.status_code == 503 and res.headers['retry-after'] == '1'
+        assert cli.get('/', headers={'User-Agent': 'Googlebot'}).status_code == 503
+        assert '<li></li>' in cli.get('/items', headers=hx).text
+        assert cli.get('/health').text == 'ok'
+    finally: ctl.inflight = 0
+    assert ctl.shed - shed == Counter(page=1, crawler=1)
+
+def test_htmx_fallback_and_cache():
+    assert cli.get('/items?q=a', headers=hx).status_code == 200
+    ctl.inflight = 10
+    try:
+        assert '<li>a</li>' in cli.get('/items?q=a', headers=hx).text
+        res = cli.get('/items?q=b', headers=hx)
+        assert res.status_code == 200 and 'Busy, try again' in res.text
+    finally: ctl.inflight = 0
+
+def test_only_public_responses_replayed():
+    assert 'anon' in cli.get('/balance', headers=hx).text
+    ctl.inflight = 10
+    try: assert 'Balance' not in cli.get('/balance', headers=hx).text
+    finally: ctl.inflight = 0
+    assert AdmissionControl().cache_size == 0
+
+def test_sheds_on_loop_lag():
+    ctl.lag = 0.45
+    try:
+        assert cli.get('/').status_code == 503
+        assert cli.get('/items', headers=hx).status_code == 200
+    finally: ctl.lag = 0.
@@ -0,0 +1,135 @@
+from fasthtml.common import *
+from starlette.testclient import TestClient
+
+def Todos(items, title='Todos'):
+    return Div(H2(title, id='todo-title'), Ul(*[Li(o, id=f'todo-{i}') for i,o in items], id='todo-list'), id='todos')
+
+old = Todos([(1,'milk'), (2,'eggs'), (3,'bread')])
+
+def test_unchanged():
+    assert diff_swap(old, Todos([(1,'milk'), (2,'eggs'), (3,'bread')])) == ()
+
+def test_replace_append_delete():
+    new = Todos([(1,'milk'), (3,'toast'), (4,'jam')], title='Shopping')
+    swaps = diff_swap(old, new)
+    assert to_xml(swaps) == ('<h2 id="todo-title" hx-swap-oob="true">Shopping</h2>\n'
+                             '<li id="todo-2" hx-swap-oob="delete"></li>\n'
+                             '<li id="todo-3" hx-swap-oob="true">toast</li>\n'
+                             '<ul hx-swap-oob="beforeend:#todo-list">\n  <li id="todo-4">jam</li>\n</ul>\n')
+
+def test_savings():
+    items = [(i, f'item {i}') for i in range(100)]
+    swaps = diff_swap(Todos(items), Todos(items[:50] + [(50, 'changed')] + items[51:]))
+    assert len(swaps) == 1 and swaps.sent < swaps.full/20 and swaps.saved == swaps.full-swaps.sent
+
+def test_reorder_replaces_list():
+    swaps = diff_swap(old, Todos([(2,'eggs'), (1,'milk'), (3,'bread')]))
+    assert len(swaps) == 1 and swaps[0].id == 'todo-list' and swaps[0].hx_swap_oob == 'true'
+
+def test_unkeyed_change_replaces_region():
+    swaps = diff_swap(Div(P('a'), id='r'), Div(P('b'), id='r'))
+    assert to_xml(swaps) == '<div id="r" hx-swap-oob="true">\n  <p>b</p>\n</div>\n'
+    try: diff_swap(P('a'), P('b'))
+    except ValueError: pass
+    else: assert False, 'expected ValueError'
+
+def test_non_str_children():
+    swaps = diff_swap(Div(P(1, id='a'), P(0.5), id='r'), Div(P(2, id='a'), P(0.5), id='r'))
+    assert to_xml(swaps) == '<p id="a" hx-swap-oob="true">2</p>\n'
+    assert diff_swap(Div(P(1), P(True), id='r'), Div(P(1), P(True), id='r')) == ()
+
+def test_http_ws_and_sse():
+    app,rt = fast_app()
+    added = Todos([(1,'milk'), (2,'eggs'), (3,'bread'), (4,'jam')])
+    @rt('/todos')
+    def post(): return diff_swap(old, added)
+    @app.ws('/ws')
+    async def ws(msg:str, send): await send(diff_swap(old, added))
+    cli = TestClient(app)
+    res = cli.post('/todos', headers={'HX-Request': '1'})
+    assert res.text == '<ul hx-swap-oob="beforeend:#todo-list">\n  <li id="todo-4">jam</li>\n</ul>\n'
+    with cli.websocket_connect('/ws') as ws:
+        ws.send_text('{"msg": "add"}')
+        assert ws.receive_text() == res.text
+    msg = sse_message(diff_swap(old, Todos([(1,'milk')])))
+    assert msg.count('hx-swap-oob="delete"') == 2
+
+class Counter(LiveComponent):
+    count = 0
+    def render(self): return Div(P(self.count, id='count'), self.action('inc', '+'), id='counter')
+    def on_inc(self, by:int=1): self.count += by
+
+def _tok(html): return re.search(r'tok=([\w.-]+)', html).group(1)
+
+def test_live_component():
+    app,rt = fast_app(exts='ws')
+    Counter.mount(app)
+    @rt('/')
+    def get(): return Counter.live()
+    cli = TestClient(app)
+    page = cli.get('/').text
+    assert 'ws-connect="/live/counter?tok=' in page and 'hx-vals=\'{"event": "inc"}\'' in page
+    with cli.websocket_connect(f'/live/counter?tok={_tok(page)}') as ws:
+        ws.send_text('{"event": "inc", "by": "2", "HEADERS": {}}')
+        assert ws.receive_text() == '<p id="count" hx-swap-oob="true">2</p>\n'
+        ws.send_text('{"event": "inc", "HEADERS": {}}')
+        assert ws.receive_text() == '<p id="count" hx-swap-oob="true">3</p>\n'
+        ws.send_text('{"event": "nope", "HEADERS": {}}')
+        assert ws.receive_text() == 'Unknown event: nope'
+    assert Counter.store[_tok(page)].count == 3
+
+def _live_app(cls, **kw):
+    app,rt = fast_app(exts='ws')
+    cls.mount(app, **kw)
+    @rt('/')
+    def get(count:int=0): return cls.live(count=count)
+    return TestClient(app)
+
+def test_live_eviction():
+    class Small(Counter): pass
+    cli = _live_app(Small, maxsize=2)
+    toks = [_tok(cli.get(f'/?count={i}').text) for i in range(3)]
+    assert list(Small.store) == toks[1:]
+    with cli.websocket_connect(f'/live/small?tok={toks[0]}') as ws:
+        assert ws.receive_text().startswith('<div id="counter" hx-swap-oob="true">')
+    Small.idle = 0.05
+    time.sleep(0.1)
+    cli.get('/')
+    assert len(Small.store) == 1
+
+def _rejected(cli, path):
+    with cli.websocket_connect(path) as ws: return ws.receive()['code'] == 1008
+
+def test_live_token_checks():
+    class Guarded(Counter): pass
+    cli = _live_app(Guarded)
+    tok = _tok(cli.get('/').text)
+    other = TestClient(cli.app)
+    other.get('/')
+    assert _rejected(other, f'/live/guarded?tok={tok}')
+    assert _rejected(cli, f'/live/guarded?tok={tok}x') and _rejected(cli, '/live/guarded?tok=abc')
+    with cli.websocket_connect(f'/live/guarded?tok={tok}'):
+        assert _rejected(cli, f'/live/guarded?tok={tok}')
+    try: Guarded.live()
+    except RuntimeError: pass
+    else: assert False, 'expected RuntimeError'
+
+def test_render_required():
+    try:
+        class Blank(LiveComponent): pass
+    except TypeError: pass
+    else: assert False, 'expected TypeError'
+
+def test_push_keeps_alive():
+    class Pushed(Counter): pass
+    cli = _live_app(Pushed, idle=0.2)
+    tok = _tok(cli.get('/').text)
+    with cli, cli.websocket_connect(f'/live/pushed?tok={tok}') as ws:
+        o = Pushed.store[tok]
+        for i in range(1, 5):
+            time.sleep(0.1)
+            o.count = i
+            cli.portal.call(o.push)
+            assert ws.receive_text() == f'<p id="count" hx-swap-oob="true">{i}</p>\n'
+        cli.get('/')
+        assert tok in Pushed.store
@@ -0,0 +1,61 @@
+import json, time
+from fasthtml.common import *
+from starlette.testclient import TestClient
+
+app, rt = fast_app()
+cli = TestClient(app)
+hx = {'HX-Request': '1'}
+
+@rt("/search", before=RateLimit(2, per=60, proxy_hops=1))
+def get(q: str = ''): return P(q)
+
+@rt("/export", before=RateLimit(1, per=60, key='session', name='export'))
+def get(): return 'data'
+
+def test_route_limit_by_ip():
+    hdrs = {'X-Forwarded-For': '10.0.0.1'}
+    assert cli.get('/search', headers=hdrs).status_code == 200
+    assert cli.get('/search', headers=hdrs).status_code == 200
+    res = cli.get('/search', headers=hdrs)
+    assert res.status_code == 429 and 20 <= int(res.headers['retry-after']) <= 30
+    assert cli.get('/search', headers={'X-Forwarded-For': '10.0.0.2'}).status_code == 200
+
+def test_htmx_response():
+    hdrs = {'X-Forwarded-For': '10.0.0.3', **hx}
+    for _ in range(2): cli.get('/search', headers=hdrs)
+    res = cli.get('/search', headers=hdrs)
+    assert res.status_code == 429 and res.headers['hx-reswap'] == 'none'
+    assert 'retryAfter' in json.loads(res.headers['hx-trigger'])['rateLimited']
+
+def test_session_key():
+    other = TestClient(app)
+    assert cli.get('/export').status_code == 200
+    assert cli.get('/export').status_code == 429
+    assert other.get('/export').status_code == 200
+
+def test_sqlite_store_shared(tmp_path):
+    path = tmp_path/'rl.db'
+    a,b = SqliteStore(path),SqliteStore(path)
+    assert a.take('k', 1, 2) == 0 and b.take('k', 1, 2) == 0
+    assert 0 < a.take('k', 1, 2) <= 1
+
+def test_sqlite_store_prunes_full_buckets(tmp_path):
+    st = SqliteStore(tmp_path/'rl.db', prune_every=0)
+    st.take('fast', 100, 1)
+    st.take('slow', 1/60, 1)
+    time.sleep(0.02)
+    st.take('other', 100, 1)
+    keys = {k for k, in st._db().execute('select key from buckets')}
+    assert keys == {'slow', 'other'}
+
+def test_beforeware():
+    rl = RateLimit(1, per=60)
+    app, rt = fast_app(before=Beforeware(rl, skip=['/health']))
+    @rt("/")
+    def get(): return 'home'
+    @rt("/health")
+    def get(): return 'ok'
+    cli = TestClient(app)
+    assert cli.get('/').status_code == 200
+    assert cli.get('/').status_code == 429
+    assert cli.get('/health').status_code == 200